@@ -0,0 +1,392 @@
+"""
+Check that the release notes extraction engines produce identical output.
+
+This script builds a fixture repository, runs every extraction engine of
+release_notes.py on it (and optionally on a real repository) with several
+option sets, and reports any field that differs. It is a development and CI
+check only; it is not shipped with the release notes assets.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from release_notes import EXTRACTION_ENGINES, ReleaseNotesBuilder, should_exclude_commit
+
+
+def build_fixture_repository(path):
+    """
+    Create a small repository exercising the tag attachment and classification paths.
+    
+    History (oldest first) on 'main':
+        - lightweight release tag (v1.0.0) and annotated release tag (v1.1.0)
+        - a feature commit tagged v1.2.0 on its branch, squash-merged into main
+          (only reachable through the patch-id fallback)
+        - a prerelease tag (v1.3.0-rc.1, ignored) and a binary file
+        - a --no-ff merge of a two-commit branch, tagged v1.3.0 (annotated)
+        - bot and conventional commits after the last release (Incoming)
+        - a commit-graph file that does not include the last commits
+        - a branch forked before v1.2.0, merged at the head: its commit is
+          the newest non-merge commit but does not contain v1.3.0
+    
+    Commit dates are fixed so the output is reproducible.
+    
+    Args:
+        path: Directory to create the repository in (must not exist or be empty)
+    
+    Returns:
+        Path of the created repository
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    clock = {'time': 1700000000}
+    
+    def run(*args, author='Dev'):
+        clock['time'] += 3600
+        env = dict(os.environ)
+        env.update({
+            'GIT_AUTHOR_NAME': author,
+            'GIT_AUTHOR_EMAIL': f"{author.split('[')[0].lower()}@example.com",
+            'GIT_COMMITTER_NAME': 'Dev',
+            'GIT_COMMITTER_EMAIL': 'dev@example.com',
+            'GIT_AUTHOR_DATE': f"{clock['time']} +0000",
+            'GIT_COMMITTER_DATE': f"{clock['time']} +0000"
+        })
+        subprocess.run(['git', *args], cwd=path, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    def commit(message, filename, content, author='Dev'):
+        file_path = path / filename
+        if isinstance(content, bytes):
+            file_path.write_bytes(content)
+        else:
+            file_path.write_text(content, encoding='utf-8')
+        run('add', filename)
+        run('commit', '-m', message, author=author)
+    
+    run('init', '-q')
+    run('checkout', '-q', '-b', 'main')
+    run('config', 'commit.gpgsign', 'false')
+    run('config', 'tag.gpgsign', 'false')
+    
+    commit('feat: initial import', 'app.txt', 'v1\n')
+    run('tag', 'v1.0.0')
+    commit('fix: handle empty input\n\nCloses #1', 'app.txt', 'v1\nfix\n')
+    run('tag', '-a', 'v1.1.0', '-m', 'Release 1.1.0')
+    
+    run('checkout', '-q', '-b', 'feature/squash')
+    commit('feat: add export command', 'export.txt', 'export\n')
+    run('tag', 'v1.2.0')
+    run('checkout', '-q', 'main')
+    run('merge', '--squash', 'feature/squash')
+    run('commit', '-m', 'feat: add export command (#2)')
+    
+    commit('docs: update readme', 'README.md', '# Fixture\n')
+    run('tag', 'v1.3.0-rc.1')
+    commit('chore: add logo', 'logo.bin', bytes(range(256)))
+    
+    run('checkout', '-q', '-b', 'feature/merge')
+    commit('refactor: split module\n\nBreaking-Change: module.txt is split in two', 'module.txt', 'a\nb\n')
+    commit('test: cover module', 'module_test.txt', 'ok\n')
+    run('checkout', '-q', 'main')
+    commit('perf: cache lookups', 'app.txt', 'v1\nfix\ncache\n')
+    run('merge', '--no-ff', 'feature/merge', '-m', "Merge branch 'feature/merge'")
+    run('tag', '-a', 'v1.3.0', '-m', 'Release 1.3.0')
+    
+    commit('Update dependency foo to v2', 'deps.txt', 'foo==2\n', author='renovate[bot]')
+    commit('ci: run on tags\n\nRelease-Note: none', 'ci.yml', 'on: push\n')
+    commit('Add search box\n\nTyping filters the list.\n\nType: perf\nCo-authored-by: Ann <ann@example.com>\n'
+           'co-authored-by: Bob <bob@example.com>', 'search.txt', 'search\n')
+    
+    # Commit-graph covering all but the last commit (exercises the fallback walk)
+    run('commit-graph', 'write', '--reachable')
+    commit('style: format search box', 'search.txt', 'search \n')
+    
+    run('checkout', '-q', '-b', 'feature/late', 'v1.1.0')
+    commit('feat: add side panel', 'side.txt', 'side\n')
+    run('checkout', '-q', 'main')
+    run('merge', '--no-ff', 'feature/late', '-m', "Merge branch 'feature/late'")
+    return path
+
+
+ENGINE_CHECK_SCENARIOS = [
+    {'num_commits': 100},
+    {'num_commits': 3},
+    {'num_commits': 100, 'first_parent': True, 'nest_merged': True},
+    {'num_commits': 100, 'exclude_author_patterns': ['renovate'], 'exclude_title_patterns': ['^docs']},
+    {'num_commits': 4, 'exclude_author_patterns': ['renovate', r'\[bot\]$'],
+     'exclude_message_patterns': ['feature docs', '^style'], 'fill_after_exclude': True},
+    {'num_commits': 100, 'exclude_trailer_patterns': ['Release-Note=^none$', 'Breaking-Change']},
+    # Excludes the merge tagged v1.3.0: the tag moves to the nearest surviving commit above it
+    {'num_commits': 9, 'exclude_title_patterns': ['^Merge branch']},
+    # Excludes the head merge: v1.3.0 is out of range and the new head (the side branch commit)
+    # does not contain it, so cached attachments from another head must not be reused
+    {'num_commits': 3, 'exclude_title_patterns': ['^Merge']}
+]
+
+
+def compare_engines(repo_path, branch='main', engines=None, scenarios=None):
+    """
+    Run every extraction engine on a repository and diff their output field by field.
+    
+    The reference is the first engine without the commit-graph (plain
+    `git merge-base` ancestry) and with exclude patterns evaluated in Python only. Every engine is then run with the
+    commit-graph, the other engines without it, and every engine with a tag
+    attachment cache warmed by the previous runs; all must produce the
+    same commits, in the same order, with identical fields (tags, type,
+    stats, merged commits, ...).
+    
+    Args:
+        repo_path: Path to the git repository
+        branch: Branch name to analyze
+        engines: Engine names to compare (default: all EXTRACTION_ENGINES)
+        scenarios: List of iter_commits keyword arguments (default: ENGINE_CHECK_SCENARIOS)
+    
+    Returns:
+        List of difference strings (empty if all engines agree)
+    """
+    engines = list(engines or EXTRACTION_ENGINES)
+    reference_builder = ReleaseNotesBuilder(repo_path, use_commit_graph=False, push_down_excludes=False)
+    graph_builder = ReleaseNotesBuilder(repo_path, repo=reference_builder.repo)
+    cache_dir = tempfile.TemporaryDirectory(prefix='release_notes_tag_cache_')
+    # Shared across scenarios, so later scenarios run with a warm cache
+    cached_builder = ReleaseNotesBuilder(repo_path, repo=reference_builder.repo,
+                                         tag_cache_path=Path(cache_dir.name) / 'tags.json')
+    variants = [(f'{engine}+commit-graph', engine, graph_builder) for engine in engines]
+    variants += [(engine, engine, reference_builder) for engine in engines[1:]]
+    variants += [(f'{engine}+tag-cache', engine, cached_builder) for engine in engines]
+    differences = []
+    
+    for scenario in scenarios or ENGINE_CHECK_SCENARIOS:
+        options = dict(scenario)
+        num_commits = options.pop('num_commits', 10)
+        label = ', '.join(f'{key}={value}' for key, value in scenario.items())
+        reference_name = engines[0]
+        reference = reference_builder.get_commits(num_commits, branch, engine=reference_name, **options)
+        
+        for name, engine, builder in variants:
+            candidate = builder.get_commits(num_commits, branch, engine=engine, **options)
+            differences += diff_commit_lists(label, reference_name, reference, name, candidate)
+    for builder in (graph_builder, cached_builder, reference_builder):
+        builder.close()
+    cache_dir.cleanup()
+    return differences
+
+
+def diff_commit_lists(label, reference_name, reference, name, candidate):
+    """
+    Diff two commit lists field by field.
+    
+    Args:
+        label: Scenario label prefixed to each difference
+        reference_name: Name of the reference run
+        reference: Reference list of commit dictionaries
+        name: Name of the compared run
+        candidate: Compared list of commit dictionaries
+    
+    Returns:
+        List of difference strings (empty if both lists are identical)
+    """
+    differences = []
+    if len(candidate) != len(reference):
+        differences.append(f"[{label}] {name}: {len(candidate)} commits, {reference_name}: {len(reference)}")
+    for index, (expected, actual) in enumerate(zip(reference, candidate)):
+        for field in sorted(set(expected) | set(actual)):
+            if expected.get(field) != actual.get(field):
+                differences.append(
+                    f"[{label}] commit #{index} {expected['short_hash']} field '{field}': "
+                    f"{reference_name}={expected.get(field)!r} {name}={actual.get(field)!r}"
+                )
+    return differences
+
+
+def compare_shallow_clone(repo_path, branch='main', num_commits=3, max_depth=5):
+    """
+    Deepen shallow clones of a local bare copy of a repository and diff them against the full one.
+    
+    Each clone starts at depth 1 without tags. Without a depth limit,
+    ensure_history must fetch enough history and release tags for the last
+    num_commits commits to come out exactly as in the full repository
+    (tags included). With max_depth, it must stop at that depth while the
+    clone is still shallow (first-parent history within max_depth commits)
+    and report the release tags it did not reach.
+    
+    Args:
+        repo_path: Path to the (full) git repository
+        branch: Branch name to analyze
+        num_commits: Number of commits to compare
+        max_depth: Depth limit of the bounded clone (below the oldest release tag)
+    
+    Returns:
+        List of difference strings (empty if the deepened clones behave as expected)
+    """
+    differences = []
+    with tempfile.TemporaryDirectory(prefix='release_notes_shallow_') as tmp_dir:
+        remote_path = Path(tmp_dir) / 'remote.git'
+        subprocess.run(['git', 'clone', '-q', '--bare', str(repo_path), str(remote_path)],
+                       check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        def deepened_clone(name, depth_limit):
+            clone_path = Path(tmp_dir) / name
+            subprocess.run(['git', 'clone', '-q', '--depth', '1', '--no-tags', '--single-branch', '--branch', branch,
+                            remote_path.as_uri(), str(clone_path)],
+                           check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            builder = ReleaseNotesBuilder(clone_path)
+            report = builder.ensure_history(num_commits, branch, max_depth=depth_limit)
+            available = int(builder.repo.git.rev_list('--count', branch))
+            if report['available_commits'] != available:
+                differences.append(f"[{name}] reported {report['available_commits']} available commits, "
+                                   f"branch has {available}")
+            return builder, report
+        
+        label = f'shallow clone, num_commits={num_commits}'
+        builder, report = deepened_clone('clone', None)
+        if not report['shallow']:
+            differences.append(f"[{label}] clone is not shallow")
+        if report['tags_missing']:
+            differences.append(f"[{label}] release tags not reached: {', '.join(report['tags_missing'])}")
+        with ReleaseNotesBuilder(repo_path) as reference_builder:
+            reference = reference_builder.get_commits(num_commits, branch)
+        differences += diff_commit_lists(label, 'full', reference, 'deepened', builder.get_commits(num_commits, branch))
+        builder.close()
+        
+        label = f'shallow clone, num_commits={num_commits}, max_depth={max_depth}'
+        builder, report = deepened_clone('bounded', max_depth)
+        if report['complete']:
+            differences.append(f"[{label}] clone was fully unshallowed")
+        # Merges bring in several commits per deepen step: bound the first-parent depth
+        depth = int(builder.repo.git.rev_list('--count', '--first-parent', branch))
+        if depth > max(max_depth, num_commits + 1):
+            differences.append(f"[{label}] deepened to {depth} first-parent commits")
+        if not report['tags_missing']:
+            differences.append(f"[{label}] no unreached release tag reported")
+        builder.close()
+    return differences
+
+
+def compare_fill_modes(repo_path, branch='main', engines=None, scenarios=None):
+    """
+    Check that fill_after_exclude returns the same commits as the default mode.
+    
+    For each scenario with exclude patterns, the default mode keeps K of the
+    last N commits, N being extended over the excluded commits below them
+    (fill mode's walked range also ends right before the next surviving
+    commit); fill mode asked for K commits must return exactly those
+    commits, with the same tags and fields. Fill mode asked for 0 commits
+    must return none.
+    
+    Args:
+        repo_path: Path to the git repository
+        branch: Branch name to analyze
+        engines: Engine names to compare (default: all EXTRACTION_ENGINES)
+        scenarios: List of iter_commits keyword arguments (default: ENGINE_CHECK_SCENARIOS)
+    
+    Returns:
+        List of difference strings (empty if both modes agree)
+    """
+    differences = []
+    with ReleaseNotesBuilder(repo_path) as builder:
+        for engine in engines or EXTRACTION_ENGINES:
+            for scenario in scenarios or ENGINE_CHECK_SCENARIOS:
+                options = {key: value for key, value in scenario.items() if key not in ('num_commits', 'fill_after_exclude')}
+                if not any(key.startswith('exclude_') for key in options):
+                    continue
+                label = f"{engine}, fill vs default, " + ', '.join(f'{key}={value}' for key, value in options.items())
+                walk_options = {key: value for key, value in options.items() if not key.startswith('exclude_')}
+                exclude_options = {key: value for key, value in options.items() if key.startswith('exclude_')}
+                walked = builder.get_commits(None, branch, engine=engine, **walk_options)
+                num_commits = scenario['num_commits']
+                while num_commits < len(walked) and should_exclude_commit(
+                        walked[num_commits]['message'].split('\n')[0], walked[num_commits]['author'],
+                        walked[num_commits]['message'], trailers=walked[num_commits].get('trailers'),
+                        **exclude_options):
+                    num_commits += 1
+                reference = builder.get_commits(num_commits, branch, engine=engine, **options)
+                candidate = builder.get_commits(len(reference), branch, engine=engine, fill_after_exclude=True, **options)
+                differences += diff_commit_lists(label, 'default', reference, 'fill', candidate)
+                empty = builder.get_commits(0, branch, engine=engine, fill_after_exclude=True, **options)
+                if empty:
+                    differences.append(f"[{label}] fill mode returned {len(empty)} commit(s) for num_commits=0")
+    return differences
+
+
+def check_engines(repo_path=None, branch='main'):
+    """
+    Compare all extraction engines on a fixture repository (and optionally a real one).
+    
+    Args:
+        repo_path: Optional extra repository to compare engines on
+        branch: Branch to analyze in repo_path
+    
+    Returns:
+        True if all engines agree everywhere
+    """
+    ok = True
+    
+    def report(differences, error, success):
+        if differences:
+            print(f"[ERROR] {error} ({len(differences)} difference(s)):")
+            for difference in differences:
+                print(f"  - {difference}")
+            return False
+        print(f"[OK] {success}")
+        return True
+    
+    def check_repository(path, name, branch):
+        engines_ok = report(
+            compare_engines(path, branch), f"Engines differ on {name}",
+            f"Engines {', '.join(EXTRACTION_ENGINES)} (with and without commit-graph and tag cache) agree on {name} "
+            f"({len(ENGINE_CHECK_SCENARIOS)} scenarios)"
+        )
+        fill_ok = report(
+            compare_fill_modes(path, branch), f"Fill mode differs from the default mode on {name}",
+            f"Fill mode returns the same commits and tags as the default mode on {name}"
+        )
+        return engines_ok and fill_ok
+    
+    with tempfile.TemporaryDirectory(prefix='release_notes_fixture_') as tmp_dir:
+        fixture_path = build_fixture_repository(Path(tmp_dir) / 'fixture')
+        ok = check_repository(fixture_path, 'fixture', 'main') and ok
+        ok = report(
+            compare_shallow_clone(fixture_path, 'main'), "Deepened shallow clones differ from the fixture",
+            "Deepened shallow clone of the fixture matches the full repository; the depth-limited one reports unreached tags"
+        ) and ok
+    if repo_path:
+        try:
+            ok = check_repository(repo_path, repo_path, branch) and ok
+        except Exception as e:
+            print(f"[ERROR] Failed to process repository {repo_path}: {e}")
+            ok = False
+    return ok
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description='Compare all release notes extraction engines on a generated fixture repository '
+                    '(and optionally on --repo_path), report field-by-field differences and exit '
+                    'with a non-zero exit code on mismatch'
+    )
+    
+    parser.add_argument(
+        '--repo_path',
+        type=str,
+        default=None,
+        help='Also compare engines on this git repository (default: fixture only)'
+    )
+    
+    parser.add_argument(
+        '--branch',
+        type=str,
+        default='main',
+        help='Branch to analyze in --repo_path (default: main)'
+    )
+    
+    args = parser.parse_args()
+    sys.exit(0 if check_engines(args.repo_path, args.branch) else 1)
+
+
+if __name__ == '__main__':
+    main()
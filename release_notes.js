@@ -34,6 +34,65 @@ function isReleaseVersionTag(tag) {
     return releasePattern.test(tag);
 }
 
+// Expand the columnar JSON format (release_notes.py --json_format columnar)
+// back to one object per commit. Other data is returned unchanged.
+function expandColumnarData(data) {
+    if (!data || data.format !== 'columnar') {
+        return data;
+    }
+    const columns = data.commits;
+    const tags = columns.tags || {};
+    const trailers = columns.trailers || {};
+    const mergedCommits = columns.merged_commits || {};
+    const commits = columns.hash.map((hash, index) => {
+        const [author, email] = data.authors[columns.author[index]];
+        const message = columns.message[index];
+        const commit = {
+            hash,
+            short_hash: hash.substring(0, 7),
+            author,
+            email,
+            timestamp: columns.timestamp[index],
+            message,
+            message_short: (message.split('\n')[0] || '').substring(0, 100),
+            type: data.types[columns.type[index]],
+            files_changed: columns.files_changed[index],
+            insertions: columns.insertions[index],
+            deletions: columns.deletions[index]
+        };
+        if (tags[index]) {
+            commit.tags = tags[index];
+        }
+        if (trailers[index]) {
+            commit.trailers = trailers[index];
+        }
+        if (mergedCommits[index]) {
+            commit.merged_commits = mergedCommits[index].map(merged => ({
+                hash: merged.hash,
+                short_hash: merged.hash.substring(0, 7),
+                author: data.authors[merged.author][0],
+                timestamp: merged.timestamp,
+                message_short: merged.message_short,
+                type: merged.type
+            }));
+        }
+        return commit;
+    });
+    const columnarKeys = ['format', 'format_version', 'authors', 'types', 'commits', 'releases'];
+    const expanded = {};
+    Object.keys(data).forEach(key => {
+        if (!columnarKeys.includes(key)) {
+            expanded[key] = data[key];
+        }
+    });
+    expanded.commits = commits;
+    if (data.releases) {
+        // Release index ranges, used by loadReleaseNotes instead of parseReleases
+        expanded.release_ranges = data.releases;
+    }
+    return expanded;
+}
+
 let currentViewMode = 'commit'; // 'commit' or 'release'
 let globalData = null; // Store data globally for mode switching
 let releases = []; // Store aggregated releases
@@ -102,11 +161,13 @@ async function loadReleaseNotes() {
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
-        const data = await response.json();
+        const data = expandColumnarData(await response.json());
         globalData = data;
         
-        // Parse releases from tags
-        releases = parseReleases(data.commits);
+        // Releases from the columnar index ranges, or parsed from tags
+        releases = data.release_ranges
+            ? releasesFromRanges(data.commits, data.release_ranges)
+            : parseReleases(data.commits);
 
         // Update release count badges
         const incomingBadge = document.getElementById('incoming-badge');
@@ -211,37 +272,50 @@ function parseReleases(commits) {
         tagGroups.push({ index, tags: tagsAtIndex });
     });
     
-    const releasesList = [];
+    const ranges = [];
     
     // Check for commits before the first tag (Incoming commits)
     if (tagGroups.length > 0 && tagGroups[0].index > 0) {
-        const incomingCommits = commits.slice(0, tagGroups[0].index);
-        releasesList.push({
-            tag: 'Incoming',
-            commits: incomingCommits,
-            startDate: incomingCommits[0] ? formatTimestampToDate(incomingCommits[0].timestamp) : 'Unknown',
-            endDate: incomingCommits[incomingCommits.length - 1] ? formatTimestampToDate(incomingCommits[incomingCommits.length - 1].timestamp) : 'Unknown',
-            commitCount: incomingCommits.length,
-            isVirtual: true
-        });
+        ranges.push({ tag: 'Incoming', start: 0, end: tagGroups[0].index, is_virtual: true });
     }
     
     for (let i = 0; i < tagGroups.length; i++) {
         const currentGroup = tagGroups[i];
         const nextGroup = i < tagGroups.length - 1 ? tagGroups[i + 1] : null;
-        
-        const startIndex = currentGroup.index;
-        const endIndex = nextGroup ? nextGroup.index : commits.length;
-        
-        const releaseCommits = commits.slice(startIndex, endIndex);
-        releasesList.push({
+        ranges.push({
             tag: currentGroup.tags.join(' / '), // Merge multiple tags on same commit
+            start: currentGroup.index,
+            end: nextGroup ? nextGroup.index : commits.length,
+            is_virtual: false
+        });
+    }
+    
+    return releasesFromRanges(commits, ranges);
+}
+
+// Build releases from [start, end) index ranges into commits (same shape as
+// the columnar "releases" table written by release_notes.py).
+function releasesFromRanges(commits, ranges) {
+    const releasesList = ranges.map(range => {
+        const releaseCommits = commits.slice(range.start, range.end);
+        if (range.is_virtual) {
+            return {
+                tag: range.tag,
+                commits: releaseCommits,
+                startDate: releaseCommits[0] ? formatTimestampToDate(releaseCommits[0].timestamp) : 'Unknown',
+                endDate: releaseCommits[releaseCommits.length - 1] ? formatTimestampToDate(releaseCommits[releaseCommits.length - 1].timestamp) : 'Unknown',
+                commitCount: releaseCommits.length,
+                isVirtual: true
+            };
+        }
+        return {
+            tag: range.tag,
             commits: releaseCommits,
             startDate: formatTimestampToDate(releaseCommits[0]?.timestamp),
             endDate: formatTimestampToDate(releaseCommits[releaseCommits.length - 1]?.timestamp),
             commitCount: releaseCommits.length
-        });
-    }
+        };
+    });
     
     // Sort by date (most recent first)
     return releasesList.sort((a, b) => {
@@ -322,9 +396,27 @@ function populateReleaseDropdown() {
     });
 }
 
+// Pre-rendered release fragments (release_notes.py --html_fragments): tag -> Promise<string|null>
+const releaseFragmentRequests = {};
+let releaseViewRenderId = 0;
+
+function fetchReleaseFragment(release) {
+    const path = globalData.fragments && globalData.fragments[release.tag];
+    if (!path) {
+        return Promise.resolve(null);
+    }
+    if (!(release.tag in releaseFragmentRequests)) {
+        releaseFragmentRequests[release.tag] = fetch(path)
+            .then(response => (response.ok ? response.text() : null))
+            .catch(() => null);
+    }
+    return releaseFragmentRequests[release.tag];
+}
+
 function displayReleaseView(selectedReleaseTag) {
     const container = document.getElementById('releases-container');
     container.innerHTML = '';
+    const renderId = ++releaseViewRenderId;
     
     let releasesToDisplay = releases;
     if (selectedReleaseTag) {
@@ -336,52 +428,71 @@ function displayReleaseView(selectedReleaseTag) {
         return;
     }
     
-    // Build HTML for releases
-    const releaseHTML = releasesToDisplay.map(release => {
-        // Group commits by type
-        const grouped = { feat: [], fix: [], docs: [], style: [], refactor: [], test: [], perf: [], ops: [], chore: [], other: [] };
-        release.commits.forEach(c => {
-            const t = (c.type || 'other').toLowerCase();
-            if (grouped[t]) {
-                grouped[t].push(c);
-            } else {
-                grouped.other.push(c);
+    // Insert pre-rendered fragments when every displayed release has one
+    if (globalData.fragments) {
+        Promise.all(releasesToDisplay.map(fetchReleaseFragment)).then(fragments => {
+            if (renderId !== releaseViewRenderId || currentViewMode !== 'release') {
+                return; // Another view was displayed meanwhile
+            }
+            const prerendered = fragments.every(fragment => typeof fragment === 'string');
+            showReleaseSections(container, prerendered ? fragments.join('') : releasesToDisplay.map(buildReleaseHTML).join(''), releasesToDisplay);
+            cacheCommitElements();
+            if (searchQuery) {
+                performSearch(searchQuery);
             }
         });
-        
-        // Build commit list HTML
-        const commitListHTML = release.commits.map(commit => 
-            createCommitHTML(commit, globalData.repository.url)
-        ).join('');
-        
-        // Build category summary
-        const categorySummary = Object.entries(grouped)
-            .filter(([, commits]) => commits.length > 0)
-            .map(([type, commits]) => {
-                const typeInfo = TYPE_LABELS[type] || { label: type, icon: '📦' };
-                return `<span class="release-category-badge ${type}">${typeInfo.icon} ${typeInfo.label}: ${commits.length}</span>`;
-            })
-            .join('');
-        
-        return `
-            <div class="release-section ${release.isVirtual ? 'virtual-release' : ''}" data-release-tag="${escapeHtml(release.tag)}">
-                <div class="release-header">
-                    <h2 class="release-title">${release.isVirtual ? '🚀' : '🏷️'} ${escapeHtml(release.tag)}</h2>
-                    <div class="release-meta">
-                        <span class="release-commit-count">📊 ${release.commitCount} commits</span>
-                        <span class="release-date-range">📅 ${release.startDate} to ${release.endDate}</span>
-                    </div>
-                </div>
-                <div class="release-summary">
-                    ${categorySummary}
+        return;
+    }
+    
+    showReleaseSections(container, releasesToDisplay.map(buildReleaseHTML).join(''), releasesToDisplay);
+}
+
+function buildReleaseHTML(release) {
+    // Group commits by type
+    const grouped = { feat: [], fix: [], docs: [], style: [], refactor: [], test: [], perf: [], ops: [], chore: [], other: [] };
+    release.commits.forEach(c => {
+        const t = (c.type || 'other').toLowerCase();
+        if (grouped[t]) {
+            grouped[t].push(c);
+        } else {
+            grouped.other.push(c);
+        }
+    });
+    
+    // Build commit list HTML
+    const commitListHTML = release.commits.map(commit => 
+        createCommitHTML(commit, globalData.repository.url)
+    ).join('');
+    
+    // Build category summary
+    const categorySummary = Object.entries(grouped)
+        .filter(([, commits]) => commits.length > 0)
+        .map(([type, commits]) => {
+            const typeInfo = TYPE_LABELS[type] || { label: type, icon: '📦' };
+            return `<span class="release-category-badge ${type}">${typeInfo.icon} ${typeInfo.label}: ${commits.length}</span>`;
+        })
+        .join('');
+    
+    return `
+        <div class="release-section ${release.isVirtual ? 'virtual-release' : ''}" data-release-tag="${escapeHtml(release.tag)}">
+            <div class="release-header">
+                <h2 class="release-title">${release.isVirtual ? '🚀' : '🏷️'} ${escapeHtml(release.tag)}</h2>
+                <div class="release-meta">
+                    <span class="release-commit-count">📊 ${release.commitCount} commits</span>
+                    <span class="release-date-range">📅 ${release.startDate} to ${release.endDate}</span>
                 </div>
-                <ul class="commit-list">
-                    ${commitListHTML}
-                </ul>
             </div>
-        `;
-    }).join('');
-    
+            <div class="release-summary">
+                ${categorySummary}
+            </div>
+            <ul class="commit-list">
+                ${commitListHTML}
+            </ul>
+        </div>
+    `;
+}
+
+function showReleaseSections(container, releaseHTML, releasesToDisplay) {
     container.innerHTML = releaseHTML;
     setupToggleHandlers();
     
@@ -443,19 +554,27 @@ function displaySummary(summary, commits) {
     // Count commits with tags
     const taggedCommitsCount = commits.filter(c => c.tags && c.tags.length > 0).length;
     
-    // Build timeline
-    const timeline = buildTimeline(commits);
+    let timeline;
+    let sparkline;
+    let calendarWidget;
+    if (shouldUsePrerenderedCharts(commits)) {
+        // Show the SVG charts rendered by release_notes.py --charts
+        timeline = buildPrerenderedChart('timeline', 'commit-timeline', 'Commit timeline');
+        sparkline = buildPrerenderedChart('sparkline', 'summary-sparkline', 'Commits per day');
+        calendarWidget = buildPrerenderedChart('calendar', 'commit-calendar-widget', 'Commit calendar');
+    } else {
+        // Build timeline
+        timeline = buildTimeline(commits);
 
-    // Build sparkline for commits per day
-    const sparkline = buildSparkline(commits);
+        // Build sparkline for commits per day
+        sparkline = buildSparkline(commits);
 
-    // Build calendar widget for commits (respect active category filter)
-    const calendarCommits = getCommitsForActiveTypeFilter(commits);
-    let calendarSourceCommits = calendarCommits;
-    let calendarWidget = buildCommitCalendar(calendarSourceCommits);
-    if (!calendarWidget) {
-        calendarSourceCommits = commits;
-        calendarWidget = buildCommitCalendar(calendarSourceCommits);
+        // Build calendar widget for commits (respect active category filter)
+        const calendarCommits = getCommitsForActiveTypeFilter(commits);
+        calendarWidget = buildCommitCalendar(calendarCommits);
+        if (!calendarWidget) {
+            calendarWidget = buildCommitCalendar(commits);
+        }
     }
 
     // Build total card with tag count
@@ -566,6 +685,29 @@ function displaySummary(summary, commits) {
     filterCommitsByType(activeTypeFilter);
 }
 
+// Pre-rendered charts are used for the unfiltered view on slow or data-saving
+// connections, or when the page is opened with ?charts=static
+function shouldUsePrerenderedCharts(commits) {
+    if (!globalData || !globalData.charts) return false;
+    if (commits !== globalData.commits || activeTypeFilter !== 'all' || selectedDayFilter) return false;
+
+    const params = new URLSearchParams(window.location.search);
+    if (params.get('charts') === 'static') return true;
+
+    const connection = window.navigator.connection;
+    return Boolean(connection && (connection.saveData || ['slow-2g', '2g', '3g'].includes(connection.effectiveType)));
+}
+
+function buildPrerenderedChart(name, className, label) {
+    const src = globalData.charts[name];
+    if (!src) return '';
+    return `
+        <div class="${className} prerendered-chart">
+            <img src="${escapeHtml(src)}" alt="${label}" loading="lazy">
+        </div>
+    `;
+}
+
 function updateFilterStatusBar() {
     const bar = document.getElementById('filter-status-bar');
     if (!bar) return;
@@ -1343,6 +1485,17 @@ function createCommitHTML(commit, repoUrl) {
     const tagBadges = hasTag ? commit.tags.map(tag => 
         `<span class="commit-tag" title="Git Tag: ${escapeHtml(tag)}">${escapeHtml(tag)}</span>`
     ).join('') : '';
+
+    // Commits folded under a merge (exported with --first_parent --nest_merged)
+    const mergedCommits = Array.isArray(commit.merged_commits) ? commit.merged_commits : [];
+    const mergedHTML = mergedCommits.length > 0 ? `
+                <ul class="merged-commit-list">
+                    ${mergedCommits.map(merged => {
+                        const mergedTypeKey = (merged.type || 'other').toLowerCase();
+                        const mergedUrl = repoUrl ? `${repoUrl}/commit/${merged.hash}` : '#';
+                        return `<li class="merged-commit-item"><a href="${mergedUrl}" target="_blank" class="commit-hash" title="${merged.hash}">${merged.short_hash}</a> <span class="commit-type type-${mergedTypeKey}">${(TYPE_LABELS[mergedTypeKey] || { label: mergedTypeKey }).label}</span> ${escapeHtml(merged.message_short)} <span class="commit-author">by ${escapeHtml(merged.author)}</span></li>`;
+                    }).join('')}
+                </ul>` : '';
     
     return `
         <li class="${commitClass}${tagClass}" data-target="${bodyId}" data-commit-type="${typeKey}" data-commit-hash="${commit.hash}" data-commit-day="${getUTCDateKeyFromTimestamp(commit.timestamp)}">
@@ -1358,7 +1511,7 @@ function createCommitHTML(commit, repoUrl) {
             </div>
             <div class="commit-summary">${summaryText}</div>
             <div class="commit-body collapsed" id="${bodyId}">
-                <div class="commit-message">${fullMessage}</div>
+                <div class="commit-message">${fullMessage}</div>${mergedHTML}
                 <div class="commit-footer">
                     <span class="commit-author">by ${escapeHtml(commit.author)}</span>
                     <div class="commit-stats">
@@ -1373,21 +1526,26 @@ function createCommitHTML(commit, repoUrl) {
 }
 
 function setupToggleHandlers() {
-    const items = document.querySelectorAll('.commit-item');
-    items.forEach(item => {
-        item.addEventListener('click', (event) => {
-            if (event.target.closest('a.commit-hash')) {
-                return; // allow link clicks without toggling
-            }
+    // One delegated listener on the container, so commits inserted as HTML
+    // (including pre-rendered release fragments) need no per-item hydration
+    const container = document.getElementById('releases-container');
+    if (!container || container.dataset.toggleHandlers) {
+        return;
+    }
+    container.dataset.toggleHandlers = 'true';
+    container.addEventListener('click', (event) => {
+        const item = event.target.closest('.commit-item');
+        if (!item || event.target.closest('a.commit-hash')) {
+            return; // allow link clicks without toggling
+        }
 
-            const targetId = item.dataset.target;
-            const body = document.getElementById(targetId);
-            if (!body) return;
+        const targetId = item.dataset.target;
+        const body = document.getElementById(targetId);
+        if (!body) return;
 
-            const isCollapsed = body.classList.contains('collapsed');
-            body.classList.toggle('collapsed', !isCollapsed);
-            body.classList.toggle('expanded', isCollapsed);
-        });
+        const isCollapsed = body.classList.contains('collapsed');
+        body.classList.toggle('collapsed', !isCollapsed);
+        body.classList.toggle('expanded', isCollapsed);
     });
 }
 
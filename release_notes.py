@@ -6,14 +6,31 @@ and exports them to JSON format for publishing release notes on GitHub Pages.
 """
 
 import git
+import hashlib
+import heapq
+import html
 import subprocess
 import json
 import argparse
 import re
-from datetime import datetime
+import os
+import mmap
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 
 
+COMMIT_TYPES = ['feat', 'fix', 'docs', 'style', 'refactor', 'test', 'perf', 'ops', 'chore', 'other']
+
+# git log placeholder for a commit's trailers: unfolded "key\x1cvalue" pairs separated by \x1d
+TRAILERS_FORMAT = '%(trailers:only,unfold,separator=%x1d,key_value_separator=%x1c)'
+
+# Deepening a shallow clone stops looking for release tags at this many commits
+DEEPEN_MAX_DEPTH = 1000
+
+
 def timestamp_to_date(timestamp):
     """Convert Unix timestamp to date string (YYYY-MM-DD HH:MM:SS)."""
     return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
@@ -56,12 +73,81 @@ def is_release_version(tag):
     return bool(re.match(r'^[vV]\d+\.\d+\.\d+(?:\+[a-zA-Z0-9.-]+)?$', tag))
 
 
-def classify_commit(first_line, author, full_message):
-    """Classify commit type using conventional prefix and heuristics."""
+def trailers_to_dict(pairs):
+    """
+    Group (key, value) trailer pairs by key.
+    
+    Keys are case-insensitive in git: later spellings of a key are merged
+    into its first spelling.
+    
+    Args:
+        pairs: List of (key, value) tuples in message order
+    
+    Returns:
+        Dictionary mapping trailer key to the list of its values
+    """
+    trailers = {}
+    spellings = {}
+    for key, value in pairs:
+        key = spellings.setdefault(key.lower(), key)
+        trailers.setdefault(key, []).append(value)
+    return trailers
+
+
+def get_trailer_values(trailers, key):
+    """Return the values of a trailer (case-insensitive key), or an empty list."""
+    key = key.lower()
+    return [value for name, values in (trailers or {}).items() if name.lower() == key for value in values]
+
+
+def parse_trailers_field(field):
+    """Parse a TRAILERS_FORMAT field of git log output into a dictionary (see trailers_to_dict)."""
+    return trailers_to_dict(
+        tuple(part.strip() for part in trailer.split('\x1c', 1))
+        for trailer in field.split('\x1d') if trailer
+    )
+
+
+def iter_commits_with_trailers(repo, rev, **kwargs):
+    """
+    Iterate over GitPython commits together with their trailers.
+    
+    Trailers come from one streamed `git log` call over the same walk
+    (same revision and rev-list options, hence the same order), read in
+    lockstep with repo.iter_commits, instead of one `git interpret-trailers`
+    process per commit. git parses them, exactly like the log engine.
+    
+    Args:
+        repo: Open git.Repo instance
+        rev: Revision or range to walk
+        **kwargs: rev-list keyword options (max_count, first_parent, ...)
+    
+    Yields:
+        Tuples (commit, trailers dictionary)
+    """
+    args = ['git', 'log', rev, f'--format=%x1e%H%x1f{TRAILERS_FORMAT}', *repo.git.transform_kwargs(**kwargs), '--']
+    trailer_records = _stream_git_records(args, cwd=repo.working_tree_dir or repo.git_dir)
+    try:
+        for commit in repo.iter_commits(rev, **kwargs):
+            commit_hash, _, trailers = next(trailer_records).partition('\x1f')
+            if commit_hash != commit.hexsha:
+                raise RuntimeError(f'Trailer walk out of sync at {commit.hexsha} ({commit_hash})')
+            yield commit, parse_trailers_field(trailers.strip('\n'))
+    finally:
+        trailer_records.close()
+
+
+def classify_commit(first_line, author, full_message, trailers=None):
+    """Classify commit type using a Type: trailer, the conventional prefix and heuristics."""
     author_l = (author or '').lower()
     first_l = (first_line or '').lower()
     full_l = (full_message or '').lower()
 
+    # Explicit Type: trailer
+    for value in get_trailer_values(trailers, 'Type'):
+        if value.strip().lower() in COMMIT_TYPES:
+            return value.strip().lower()
+
     # Conventional commit prefix
     if ':' in first_line:
         prefix = first_line.split(':', 1)[0].strip().lower()
@@ -111,6 +197,7 @@ def classify_commit(first_line, author, full_message):
         return 'chore'
 
     return 'other'
+@lru_cache(maxsize=None)
 def _compile_patterns(patterns):
     return [re.compile(p, re.IGNORECASE) for p in patterns if p]
 
@@ -118,11 +205,19 @@ def _compile_patterns(patterns):
 def should_exclude_commit(first_line, author, full_message,
                           exclude_title_patterns=None,
                           exclude_author_patterns=None,
-                          exclude_message_patterns=None):
-    """Return True if commit should be excluded based on title/author/message."""
-    title_patterns = _compile_patterns(exclude_title_patterns or [])
-    author_patterns = _compile_patterns(exclude_author_patterns or [])
-    message_patterns = _compile_patterns(exclude_message_patterns or [])
+                          exclude_message_patterns=None,
+                          trailers=None,
+                          exclude_trailer_patterns=None):
+    """
+    Return True if commit should be excluded based on title/author/message/trailers.
+    
+    Trailer patterns are 'Key=regex' strings matched against every value of
+    the trailer Key (case-insensitive); a bare 'Key' excludes commits that
+    have that trailer at all.
+    """
+    title_patterns = _compile_patterns(tuple(exclude_title_patterns or ()))
+    author_patterns = _compile_patterns(tuple(exclude_author_patterns or ()))
+    message_patterns = _compile_patterns(tuple(exclude_message_patterns or ()))
 
     title = first_line or ''
     author_val = author or ''
@@ -134,28 +229,758 @@ def should_exclude_commit(first_line, author, full_message,
         return True
     if any(p.search(message) for p in message_patterns):
         return True
+    for trailer_pattern in exclude_trailer_patterns or []:
+        key, _, pattern = trailer_pattern.partition('=')
+        values = get_trailer_values(trailers, key.strip())
+        if values and any(p.search(value) for p in _compile_patterns((pattern or '.*',)) for value in values):
+            return True
     return False
-def get_repository_commits(repo_path, num_commits=10, branch='main',exclude_title_patterns=None,
-                           exclude_author_patterns=None,
-                           exclude_message_patterns=None):
+
+
+# Exclude pattern tokens git evaluates exactly like Python's re (or more leniently):
+# ASCII literals, escaped punctuation, non-negated classes, groups, alternation and
+# * + ? quantifiers. '.', counted repetition and \w-style escapes behave differently
+# in git's locale-dependent PCRE matching; anchors are only safe for author patterns.
+_GIT_PUSHDOWN_TOKEN = re.compile(
+    r'[A-Za-z0-9 _\-:/@,;=#!%&~\'"<>]|\\[^A-Za-z0-9]|\[[A-Za-z0-9 _\-:/@.]+\]|[|*+?)]|\((?!\?)|[$^]'
+)
+
+
+def _git_pushdown_tokens(pattern, anchors=False):
+    """Split a pattern into _GIT_PUSHDOWN_TOKEN tokens, or return None if it cannot be pushed down."""
+    tokens = []
+    position = 0
+    while position < len(pattern):
+        match = _GIT_PUSHDOWN_TOKEN.match(pattern, position)
+        if not match or (match.group() in ('^', '$') and not anchors):
+            return None
+        tokens.append(match.group())
+        position = match.end()
+    return tokens or None
+
+
+def git_exclude_filters(exclude_author_patterns=None, exclude_message_patterns=None):
     """
-    Extract last N commits from the current repository.
+    Translate exclude patterns into git rev-list options evaluated during the walk.
+
+    Only patterns git matches at most as broadly as should_exclude_commit are
+    translated (see _GIT_PUSHDOWN_TOKEN); the others, and all title patterns,
+    are left to the Python post-filter, which always runs.
+
+    Args:
+        exclude_author_patterns: Regex patterns matched against the author name
+        exclude_message_patterns: Regex patterns matched against the full message
+
+    Returns:
+        Dictionary of GitPython keyword options (empty if nothing can be pushed down)
+    """
+    # git matches --author against "Name <email>": the end of the name is before ' <'
+    authors = [
+        ''.join('(?= <)' if token == '$' else token for token in tokens)
+        for tokens in (_git_pushdown_tokens(p, anchors=True) for p in exclude_author_patterns or [])
+        if tokens
+    ]
+    # git matches --grep line by line, so anchors would match inside the message
+    messages = [p for p in exclude_message_patterns or [] if _git_pushdown_tokens(p)]
+    if not authors and not messages:
+        return {}
+
+    filters = {'perl_regexp': True, 'regexp_ignore_case': True}
+    if authors:
+        # Reject idents where a pattern matches inside the name (before the '<')
+        alternatives = '|'.join(f'(?:{p})' for p in authors)
+        filters['author'] = f'^(?![^<]*?(?:{alternatives})[^<]* <)'
+    if messages:
+        # --invert-grep only inverts --grep (commits matching any pattern are dropped)
+        filters['grep'] = messages
+        filters['invert_grep'] = True
+    return filters
+
+
+def get_merged_commits(repo, merge_commit,
+                       exclude_title_patterns=None,
+                       exclude_author_patterns=None,
+                       exclude_message_patterns=None,
+                       exclude_trailer_patterns=None):
+    """
+    List the commits a merge brought in from its side branch(es).
+    
+    Only lightweight metadata is returned (no diff stats) so that folding
+    merged branches under their merge commit stays cheap.
     
     Args:
-        repo_path: Path to the git repository
-        num_commits: Number of commits to retrieve
-        branch: Branch name to analyze
+        repo: Open git.Repo instance
+        merge_commit: Merge commit to expand
     
     Returns:
-        List of commit dictionaries with metadata
+        List of commit dictionaries (newest first), empty for non-merge commits
     """
-    commits_data = []
+    if len(merge_commit.parents) < 2:
+        return []
+    
+    mainline = merge_commit.parents[0].hexsha
+    merged = []
+    for parent in merge_commit.parents[1:]:
+        for commit, trailers in iter_commits_with_trailers(repo, f'{mainline}..{parent.hexsha}'):
+            first_line = commit.message.strip().split('\n')[0]
+            if should_exclude_commit(
+                first_line,
+                commit.author.name,
+                commit.message,
+                exclude_title_patterns=exclude_title_patterns,
+                exclude_author_patterns=exclude_author_patterns,
+                exclude_message_patterns=exclude_message_patterns,
+                trailers=trailers,
+                exclude_trailer_patterns=exclude_trailer_patterns,
+            ):
+                continue
+            merged.append({
+                'hash': commit.hexsha,
+                'short_hash': commit.hexsha[:7],
+                'author': commit.author.name,
+                'timestamp': commit.authored_date,
+                'message_short': first_line[:100],
+                'type': classify_commit(first_line, commit.author.name, commit.message, trailers)
+            })
+    return merged
+
+
+class CommitGraph:
+    """
+    Read-only, memory-mapped view of git's commit-graph file(s).
+    
+    Supports a single objects/info/commit-graph file or a split chain
+    (objects/info/commit-graphs/commit-graph-chain). Commits are addressed
+    by their global position in the graph; generation numbers (topological
+    levels) are strictly greater than those of all ancestors, which lets
+    ancestry walks stop early.
+    """
+    
+    NO_PARENT = 0x70000000
+    EXTRA_EDGE = 0x80000000
+    
+    def __init__(self, git_dir):
+        """
+        Args:
+            git_dir: Repository git directory (common dir for worktrees)
+        
+        Raises:
+            FileNotFoundError: If the repository has no commit-graph
+            ValueError: If a commit-graph file cannot be parsed
+        """
+        info_dir = Path(git_dir, 'objects', 'info')
+        chain_path = info_dir / 'commit-graphs' / 'commit-graph-chain'
+        if (info_dir / 'commit-graph').exists():
+            paths = [info_dir / 'commit-graph']
+        elif chain_path.exists():
+            paths = [info_dir / 'commit-graphs' / f'graph-{graph_hash}.graph'
+                     for graph_hash in chain_path.read_text().split()]
+        else:
+            raise FileNotFoundError(f'No commit-graph in {info_dir}')
+        
+        self._layers = []
+        self.num_commits = 0
+        try:
+            for path in paths:
+                self._layers.append(self._open_layer(path, self.num_commits))
+                self.num_commits += self._layers[-1]['count']
+        except Exception:
+            self.close()
+            raise
+    
+    @staticmethod
+    def _open_layer(path, base):
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        signature, version, hash_version, num_chunks = struct.unpack_from('>4sBBB', data, 0)
+        if signature != b'CGPH' or version != 1:
+            data.close()
+            raise ValueError(f'Unsupported commit-graph file: {path}')
+        chunks = {}
+        for i in range(num_chunks):
+            chunk_id, offset = struct.unpack_from('>4sQ', data, 8 + 12 * i)
+            chunks[chunk_id] = offset
+        if not all(chunk in chunks for chunk in (b'OIDF', b'OIDL', b'CDAT')):
+            data.close()
+            raise ValueError(f'Incomplete commit-graph file: {path}')
+        hash_len = 32 if hash_version == 2 else 20
+        fanout = chunks[b'OIDF']
+        return {
+            'data': data,
+            'hash_len': hash_len,
+            'base': base,
+            'count': struct.unpack_from('>I', data, fanout + 4 * 255)[0],
+            'fanout': fanout,
+            'oids': chunks[b'OIDL'],
+            'cdat': chunks[b'CDAT'],
+            'edges': chunks.get(b'EDGE')
+        }
+    
+    def close(self):
+        """Release the memory maps."""
+        for layer in self._layers:
+            layer['data'].close()
+        self._layers = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _layer_of(self, position):
+        for layer in self._layers:
+            if position < layer['base'] + layer['count']:
+                return layer, position - layer['base']
+        raise IndexError(position)
+    
+    def lookup(self, hexsha):
+        """Return the global position of a commit, or None if it is not in the graph."""
+        oid = bytes.fromhex(hexsha)
+        for layer in self._layers:
+            data, hash_len = layer['data'], layer['hash_len']
+            first = oid[0]
+            low = struct.unpack_from('>I', data, layer['fanout'] + 4 * (first - 1))[0] if first else 0
+            high = struct.unpack_from('>I', data, layer['fanout'] + 4 * first)[0]
+            while low < high:
+                middle = (low + high) // 2
+                start = layer['oids'] + middle * hash_len
+                current = data[start:start + hash_len]
+                if current == oid:
+                    return layer['base'] + middle
+                if current < oid:
+                    low = middle + 1
+                else:
+                    high = middle
+        return None
+    
+    def hexsha(self, position):
+        """Return the object id of the commit at a global position."""
+        layer, local = self._layer_of(position)
+        start = layer['oids'] + local * layer['hash_len']
+        return layer['data'][start:start + layer['hash_len']].hex()
+    
+    def generation(self, position):
+        """Return the topological level of a commit (0 if not computed)."""
+        layer, local = self._layer_of(position)
+        offset = layer['cdat'] + local * (layer['hash_len'] + 16) + layer['hash_len'] + 8
+        return struct.unpack_from('>I', layer['data'], offset)[0] >> 2
+    
+    def parents(self, position):
+        """Return the global positions of a commit's parents."""
+        layer, local = self._layer_of(position)
+        data = layer['data']
+        offset = layer['cdat'] + local * (layer['hash_len'] + 16) + layer['hash_len']
+        first, second = struct.unpack_from('>II', data, offset)
+        parents = []
+        if first != self.NO_PARENT:
+            parents.append(first)
+        if second == self.NO_PARENT:
+            return parents
+        if not second & self.EXTRA_EDGE:
+            parents.append(second)
+            return parents
+        # Octopus merge: remaining parents are listed in the EDGE chunk
+        edge = layer['edges'] + 4 * (second & ~self.EXTRA_EDGE)
+        while True:
+            value = struct.unpack_from('>I', data, edge)[0]
+            parents.append(value & ~self.EXTRA_EDGE)
+            if value & self.EXTRA_EDGE:
+                return parents
+            edge += 4
+
+
+class TagAttachmentCache:
+    """
+    Persistent cache of release tag attachments and commit patch-ids.
+    
+    Entries are keyed by tag name and store the peeled target SHA, the
+    method used to attach the tag ('in-range', 'excluded', 'ancestry',
+    'patch-id' or 'none'), the commit it was attached to and the range head at that time.
+    An 'ancestry' entry attached to its head stays valid while the tag target
+    is unchanged and the cached head is an ancestor of the current range head:
+    the tag is then still contained by the head, which is the first commit of
+    the range.
+    Patch-ids never change for a given commit and are kept as-is; failed
+    patch-id computations are not stored, so they are retried next run.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path):
+        """
+        Args:
+            path: JSON file backing the cache (created on save)
+        """
+        self.path = Path(path)
+        self.tags = {}
+        self.patch_ids = {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if data.get('version') == self.VERSION:
+                self.tags = data.get('tags', {})
+                self.patch_ids = {
+                    commit_hash: patch_id for commit_hash, patch_id in data.get('patch_ids', {}).items() if patch_id
+                }
+        except (OSError, ValueError):
+            pass
+    
+    def get(self, tag_name, target):
+        """Return the cached entry of a tag, or None if missing or its target moved."""
+        entry = self.tags.get(tag_name)
+        if entry and entry.get('target') == target:
+            return entry
+        return None
+    
+    def set(self, tag_name, target, method, attached, head):
+        """Store how a tag was attached."""
+        self.tags[tag_name] = {
+            'target': target,
+            'method': method,
+            'attached': attached,
+            'head': head
+        }
+    
+    def prune(self, tag_names):
+        """Drop entries of tags that no longer exist."""
+        self.tags = {name: entry for name, entry in self.tags.items() if name in tag_names}
+    
+    def save(self):
+        """Write the cache to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({
+            'version': self.VERSION,
+            'tags': self.tags,
+            'patch_ids': self.patch_ids
+        }), encoding='utf-8')
+
+
+# Extraction engines: name -> ReleaseNotesBuilder method returning raw commit records.
+# All engines must produce identical output (see check_engines.py).
+EXTRACTION_ENGINES = {
+    'gitpython': '_walk_gitpython',
+    'log': '_walk_log'
+}
+
+
+def _stream_git_records(args, cwd, separator=b'\x1e', chunk_size=65536):
+    """
+    Run a git command and yield its output split on a record separator.
+    
+    Output is read incrementally, so records are available while git is
+    still walking history and the caller may stop early.
+    
+    Args:
+        args: Command line (starting with 'git')
+        cwd: Directory to run the command in
+        separator: Byte separating records in the output
+    
+    Yields:
+        Decoded records (without the separator, empty records skipped)
+    """
+    process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     try:
-        repo = git.Repo(repo_path)
-        commits = list(repo.iter_commits(branch, max_count=num_commits))
+        buffer = b''
+        while True:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            buffer += chunk
+            *records, buffer = buffer.split(separator)
+            for record in records:
+                if record:
+                    yield record.decode('utf-8', errors='replace')
+        if buffer:
+            yield buffer.decode('utf-8', errors='replace')
+    finally:
+        if process.poll() is None:
+            process.kill()
+        stderr = process.stderr.read()
+        process.stdout.close()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode not in (0, -9):
+        raise RuntimeError(f"{' '.join(args[:2])} failed: {stderr.decode('utf-8', errors='replace').strip()}")
+
+
+class ReleaseNotesBuilder:
+    """
+    Build release notes in memory from an open git repository.
+    
+    The builder keeps the git.Repo instance and a few immutable lookups
+    (repository info, patch-ids) warm between calls, so it can be reused
+    from long-running services without re-opening the repository. Nothing
+    is written to disk and nothing is printed.
+    
+    Example:
+        with ReleaseNotesBuilder('.') as builder:
+            release_data = builder.build(num_commits=50)
+            markdown = builder.render_markdown(release_data, include_timeline=True)
+    """
+    
+    def __init__(self, repo_path='.', repo=None, use_commit_graph=True, write_commit_graph=False,
+                 tag_cache_path=None, push_down_excludes=True):
+        """
+        Args:
+            repo_path: Path to the git repository
+            repo: Optional already opened git.Repo instance to reuse
+            use_commit_graph: Use git's commit-graph file (if present) for tag ancestry
+            write_commit_graph: Write a commit-graph first if the repository has none
+            tag_cache_path: Optional JSON file persisting tag attachments and patch-ids
+                between runs (see TagAttachmentCache); True uses
+                release_notes_tag_cache.json in the git directory
+            push_down_excludes: When filling to N commits after exclusion, let git
+                evaluate the author/message excludes it can (see git_exclude_filters)
+        """
+        self.repo_path = repo_path
+        self._owns_repo = repo is None
+        self.repo = repo if repo is not None else git.Repo(repo_path)
+        self.use_commit_graph = use_commit_graph
+        self.write_commit_graph = write_commit_graph
+        self.push_down_excludes = push_down_excludes
+        if tag_cache_path is True:
+            git_dir = getattr(self.repo, 'common_dir', None) or self.repo.git_dir
+            tag_cache_path = Path(git_dir) / 'release_notes_tag_cache.json'
+        self.tag_cache = TagAttachmentCache(tag_cache_path) if tag_cache_path else None
+        self.tag_stats = {}
+        self._commit_graph = None
+        self._patch_ids = self.tag_cache.patch_ids if self.tag_cache else {}
+        # Patch-ids read from the cache file, and the commits looked up / served from it
+        self._stored_patch_ids = set(self._patch_ids)
+        self._patch_id_lookups = set()
+        self._patch_id_hits = set()
+        self._repository_info = {}
+        self._perl_regexp = None
+    
+    def close(self):
+        """
+        Release the commit-graph memory maps and the repository opened by the builder.
+        
+        A repository passed in by the caller is left open. The builder stays
+        usable: the commit-graph is mapped again on demand.
+        """
+        if self._commit_graph is not None:
+            self._commit_graph.close()
+            self._commit_graph = None
+        if self._owns_repo:
+            self.repo.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def supports_perl_regexp(self):
+        """Return True if git was built with PCRE support (needed for --perl-regexp)."""
+        if self._perl_regexp is None:
+            try:
+                self.repo.git.log('-1', '--perl-regexp', '--grep=^', '--format=')
+                self._perl_regexp = True
+            except git.exc.GitCommandError:
+                self._perl_regexp = False
+        return self._perl_regexp
+    
+    def get_commit_graph(self):
+        """
+        Return the repository's CommitGraph, or None if unavailable or disabled.
+        
+        With write_commit_graph, a graph of all reachable commits is written
+        first when the repository has none.
+        """
+        if not self.use_commit_graph:
+            return None
+        if self._commit_graph is None:
+            git_dir = getattr(self.repo, 'common_dir', None) or self.repo.git_dir
+            try:
+                self._commit_graph = CommitGraph(git_dir)
+            except FileNotFoundError:
+                if not self.write_commit_graph:
+                    return None
+                try:
+                    self.repo.git.commit_graph('write', '--reachable')
+                    self._commit_graph = CommitGraph(git_dir)
+                except Exception:
+                    return None
+            except Exception:
+                return None
+        return self._commit_graph
+    
+    def is_ancestor(self, ancestor_hash, commit_hash):
+        """Return True if ancestor_hash is commit_hash or one of its ancestors."""
+        if ancestor_hash == commit_hash:
+            return True
+        found = self.find_containing_commits([ancestor_hash], [commit_hash])
+        if ancestor_hash in found:
+            return found[ancestor_hash] is not None
+        try:
+            return self.repo.is_ancestor(ancestor_hash, commit_hash)
+        except Exception:
+            return False
+    
+    def find_containing_commits(self, target_hashes, commit_hashes):
+        """
+        Find, for each target commit, the first commit of the range that contains it.
+        
+        Uses the commit-graph: a single walk from the range commits (in
+        order), sharing visited commits. Targets stop being tracked once
+        found, and the walk never descends below the lowest generation
+        number of the targets still pending, so old tags found early no
+        longer hold it down. Range commits newer than the graph are walked
+        through GitPython until the walk reaches the graph.
+        
+        Args:
+            target_hashes: Commit hashes to locate (e.g. release tag targets)
+            commit_hashes: Range commit hashes, in priority order
+        
+        Returns:
+            Dictionary mapping each target found in the graph to the first
+            range commit containing it, or None if no range commit does.
+            Targets missing from the graph are left out (callers fall back to
+            `git merge-base --is-ancestor`).
+        """
+        graph = self.get_commit_graph()
+        if graph is None:
+            return {}
+        
+        target_by_position = {}
+        for target in target_hashes:
+            position = graph.lookup(target)
+            if position is not None:
+                target_by_position[position] = target
+        if not target_by_position:
+            return {}
+        
+        # Targets still to find, with a lazily pruned heap of their generations
+        pending = dict(target_by_position)
+        pending_generations = [(graph.generation(position), position) for position in pending]
+        heapq.heapify(pending_generations)
+        found = {}
+        visited = set()
+        for recent_hash in commit_hashes:
+            stack = [recent_hash]
+            while stack and pending:
+                node = stack.pop()
+                if isinstance(node, str):
+                    position = graph.lookup(node)
+                    if position is None:
+                        # Commit newer than the graph: walk its parents with GitPython
+                        if node not in visited:
+                            visited.add(node)
+                            stack.extend(parent.hexsha for parent in self.repo.commit(node).parents)
+                        continue
+                    node = position
+                if node in visited:
+                    continue
+                visited.add(node)
+                if node in pending:
+                    found[pending.pop(node)] = recent_hash
+                    while pending_generations and pending_generations[0][1] not in pending:
+                        heapq.heappop(pending_generations)
+                generation = graph.generation(node)
+                if generation and pending_generations and generation <= pending_generations[0][0]:
+                    # Parents have lower generation numbers than every pending target
+                    continue
+                stack.extend(reversed(graph.parents(node)))
+            if not pending:
+                break
+        
+        return {target: found.get(target) for target in target_by_position.values()}
+    
+    def is_shallow(self):
+        """Return True if the repository is a shallow clone."""
+        try:
+            return self.repo.git.rev_parse('--is-shallow-repository').strip() == 'true'
+        except Exception:
+            return Path(self.repo.git_dir, 'shallow').exists()
+    
+    def ensure_history(self, num_commits=10, branch='main', remote='origin', initial_step=None,
+                       max_depth=DEEPEN_MAX_DEPTH):
+        """
+        Deepen a shallow clone only as far as needed for release notes.
+        
+        History is fetched from the remote in growing steps until the branch
+        has more than num_commits commits locally (so the oldest listed commit
+        keeps its parent for stats) and the commits of the remote release tags
+        are present, so tags are attached as in a full clone. The search for
+        release tags stops at max_depth commits (tags on other branches are
+        never reached); the remaining ones are reported. Only the history below
+        the previous shallow boundary is walked after each fetch, and commits
+        it shares with the history already present (through merges) are not
+        counted twice. Release tags whose commits are present are fetched
+        afterwards (tag objects only).
+        
+        Args:
+            num_commits: Number of commits that must be available on the branch
+            branch: Branch name to analyze
+            remote: Remote to fetch from
+            initial_step: First deepen step (defaults to num_commits)
+            max_depth: Stop deepening for release tags once the branch has this
+                many commits; each fetch deepens by at most the remaining
+                commits (merges may bring more), so the first-parent history
+                stays within max_depth (None for no limit; num_commits is always
+                covered)
+        
+        Returns:
+            Dictionary describing what was fetched: 'shallow' (before), 'deepened_by',
+            'fetches', 'available_commits', 'tags_fetched', 'tags_missing'
+            (release tags whose commits are still absent while the clone is
+            shallow) and 'complete'
+        """
+        report = {
+            'shallow': self.is_shallow(),
+            'deepened_by': 0,
+            'fetches': 0,
+            'available_commits': 0,
+            'tags_fetched': [],
+            'tags_missing': [],
+            'complete': True
+        }
+        if not report['shallow']:
+            return report
+        
+        repo = self.repo
+        cwd = repo.working_tree_dir or repo.git_dir
+        shallow_file = Path(repo.git_dir, 'shallow')
+        
+        def shallow_boundary():
+            try:
+                return shallow_file.read_text(encoding='ascii').split()
+            except OSError:
+                return []
+        
+        # Release tags on the remote, peeled to their commits
+        release_tag_targets = {}
+        for line in repo.git.ls_remote('--tags', remote).splitlines():
+            sha, _, ref = line.partition('\t')
+            name = ref[len('refs/tags/'):]
+            if name.endswith('^{}'):
+                name = name[:-3]
+                release_tag_targets[name] = sha  # peeled target wins over tag object
+            elif name not in release_tag_targets:
+                release_tag_targets[name] = sha
+        release_tag_targets = {
+            name: sha for name, sha in release_tag_targets.items() if is_release_version(name)
+        }
+        
+        def missing_targets(targets):
+            """Return the target commits not in the local object database."""
+            if not targets:
+                return set()
+            result = subprocess.run(['git', 'cat-file', '--batch-check=%(objectname) %(objecttype)'], cwd=cwd,
+                                    input='\n'.join(sorted(targets)) + '\n', stdout=subprocess.PIPE,
+                                    text=True, check=True)
+            present = {line.split()[0] for line in result.stdout.splitlines() if line.endswith(' commit')}
+            return set(targets) - present
+        
+        known = set(repo.git.rev_list(branch).split())
+        available = len(known)
+        missing = missing_targets(set(release_tag_targets.values()))
+        step = max(initial_step or num_commits, 1)
+        while self.is_shallow():
+            need_commits = available <= num_commits
+            need_tags = bool(missing) and (max_depth is None or available < max_depth)
+            if not (need_commits or need_tags):
+                break
+            if not need_commits and max_depth is not None:
+                step = min(step, max_depth - available)
+            boundary = shallow_boundary()
+            repo.git.fetch(f'--deepen={step}', '--no-tags', remote, branch)
+            report['fetches'] += 1
+            # Commits newly fetched below the old boundary commits
+            fetched = set(repo.git.rev_list(*boundary).split()) - known if boundary else set()
+            if not fetched:
+                # Nothing more to fetch for this branch
+                break
+            known |= fetched
+            report['deepened_by'] += len(fetched)
+            available += len(fetched)
+            missing = missing_targets(missing)
+            step *= 2
+        
+        # Fetch release tags whose commits are now in the local history
+        tags_to_fetch = sorted(
+            name for name, sha in release_tag_targets.items() if sha not in missing and name not in repo.tags
+        )
+        if tags_to_fetch:
+            refspecs = [f'refs/tags/{name}:refs/tags/{name}' for name in tags_to_fetch]
+            repo.git.fetch('--no-tags', remote, *refspecs)
+            report['tags_fetched'] = tags_to_fetch
+        
+        report['available_commits'] = available
+        report['complete'] = not self.is_shallow()
+        if not report['complete']:
+            report['tags_missing'] = sorted(name for name, sha in release_tag_targets.items() if sha in missing)
+        return report
+    
+    def get_patch_id(self, commit_hash):
+        """Return the stable patch-id of a commit (cached, commits are immutable), or None on failure."""
+        self._patch_id_lookups.add(commit_hash)
+        if commit_hash in self._patch_ids:
+            if commit_hash in self._stored_patch_ids:
+                self._patch_id_hits.add(commit_hash)
+            return self._patch_ids[commit_hash]
+        patch_id = None
+        try:
+            # Use bytes to avoid encoding errors on Windows
+            cwd = self.repo.working_tree_dir or self.repo.git_dir
+            diff = subprocess.run(['git', 'show', commit_hash], cwd=cwd, stdout=subprocess.PIPE, check=True)
+            p = subprocess.run(['git', 'patch-id', '--stable'], cwd=cwd, input=diff.stdout, stdout=subprocess.PIPE, check=True)
+            out = p.stdout.decode('utf-8', errors='ignore').strip()
+            if out:
+                patch_id = out.split()[0]
+        except Exception:
+            patch_id = None
+        if patch_id:
+            self._patch_ids[commit_hash] = patch_id
+        return patch_id
+    
+    def resolve_tags(self, commit_hashes, window_hashes=None):
+        """
+        Map release tags to the commits of the given range.
+        
+        Tags on an excluded commit of the walked range (in window_hashes but
+        not in commit_hashes) move to its nearest surviving descendant: the
+        last range commit above it in walk order (dropped if there is none).
+        Tags whose commit is outside the walked range are attached to the
+        recent commit that contains them (ancestry), or to the recent commit
+        with the same patch-id (squash/rebase merges).
+        
+        With a tag cache, tags attached by ancestry to the head of a previous
+        run whose head is an ancestor of the current head are reused without
+        any ancestry query, and patch-ids are read from the cache. tag_stats
+        counts only the lookups the range needed: 'lookups' tags outside the
+        range ('cached' of them reused) and 'patch_ids' patch-id fallback
+        lookups ('patch_ids_cached' of them served from the cache file).
+        
+        Args:
+            commit_hashes: List of commit hashes (the range, newest first)
+            window_hashes: Walked commit hashes in walk order, excluded commits
+                included (default: commit_hashes)
+        
+        Returns:
+            Dictionary mapping commit hash to list of tag names
+        """
+        repo = self.repo
+        cache = self.tag_cache
+        self._patch_id_lookups = set()
+        self._patch_id_hits = set()
+        if not commit_hashes:
+            self.tag_stats = {'tags': 0, 'lookups': 0, 'cached': 0, 'patch_ids': 0, 'patch_ids_cached': 0}
+            return {}
+        head = commit_hashes[0]
         
         # Set of recent commit hashes (last N on the branch)
-        commits_hashes = set(c.hexsha for c in commits)
+        commits_hashes = set(commit_hashes)
+        
+        # Nearest surviving commit above each excluded commit of the walked range
+        surviving_above = {}
+        last_surviving = None
+        for commit_hash in window_hashes or ():
+            if commit_hash in commits_hashes:
+                last_surviving = commit_hash
+            else:
+                surviving_above[commit_hash] = last_surviving
 
         # Get all tags and their associated commit hashes
         tags_by_commit = {}
@@ -187,109 +1012,521 @@ def get_repository_commits(repo_path, num_commits=10, branch='main',exclude_titl
         # the defined range while recovering lightweight tags based on merges.
         # Ajout : pour chaque tag, si le commit n'est pas dans la plage, on l'ajoute
         
+        # Tags still contained by the head according to the cache
+        tag_targets = {name: target for target, names in tags_by_commit.items() for name in names}
+        cached_targets = set()
+        if cache and head:
+            head_contains = {}
+            for name, target in tag_targets.items():
+                entry = cache.get(name, target)
+                if target in commits_hashes or target in surviving_above or not entry or entry['method'] != 'ancestry':
+                    continue
+                # Only a tag attached to the previous head is contained by the current one
+                # (an older range commit containing it may be above the head's fork point)
+                if entry['attached'] != entry['head']:
+                    continue
+                cached_head = entry['head']
+                if cached_head not in head_contains:
+                    head_contains[cached_head] = self.is_ancestor(cached_head, head)
+                if head_contains[cached_head]:
+                    cached_targets.add(target)
+        
+        # Ancestry for all tags at once through the commit-graph, when available
+        containing_commits = self.find_containing_commits(
+            [h for h in tags_by_commit if h not in commits_hashes and h not in surviving_above and h not in cached_targets],
+            commit_hashes
+        )
+        containing_commits.update({target: head for target in cached_targets})
+        
+        methods = {}
         for tag_commit_hash, tag_names in list(tags_by_commit.items()):
             if tag_commit_hash in commits_hashes:
+                methods[tag_commit_hash] = ('in-range', tag_commit_hash)
                 continue
-            attached = False
-            # 1) Try ancestry (tag commit is ancestor of a recent commit)
-            for recent in commits:
-                try:
-                    repo.git.merge_base('--is-ancestor', tag_commit_hash, recent.hexsha)
-                    if recent.hexsha not in tags_by_commit:
-                        tags_by_commit[recent.hexsha] = []
+            if tag_commit_hash in surviving_above:
+                # Excluded commit of the walked range: nearest surviving descendant
+                del tags_by_commit[tag_commit_hash]
+                surviving_hash = surviving_above[tag_commit_hash]
+                if surviving_hash:
+                    tags_by_commit.setdefault(surviving_hash, [])
                     for t in tag_names:
-                        if t not in tags_by_commit[recent.hexsha]:
-                            tags_by_commit[recent.hexsha].append(t)
-                    attached = True
-                    break
-                except Exception:
-                    continue
-            if attached:
+                        if t not in tags_by_commit[surviving_hash]:
+                            tags_by_commit[surviving_hash].append(t)
+                methods[tag_commit_hash] = ('excluded', surviving_hash)
+                continue
+            methods[tag_commit_hash] = ('none', None)
+            # 1) Try ancestry (tag commit is ancestor of a recent commit)
+            if tag_commit_hash in containing_commits:
+                containing_hash = containing_commits[tag_commit_hash]
+            else:
+                containing_hash = None
+                for recent_hash in commit_hashes:
+                    try:
+                        repo.git.merge_base('--is-ancestor', tag_commit_hash, recent_hash)
+                        containing_hash = recent_hash
+                        break
+                    except Exception:
+                        continue
+            if containing_hash:
+                if containing_hash not in tags_by_commit:
+                    tags_by_commit[containing_hash] = []
+                for t in tag_names:
+                    if t not in tags_by_commit[containing_hash]:
+                        tags_by_commit[containing_hash].append(t)
+                methods[tag_commit_hash] = ('ancestry', containing_hash)
                 continue
             # 2) If not ancestor, try patch-id matching: the tag commit
             # may have been merged/squashed producing a different hash
-            # but the same patch; compute patch-id and compare with
-            # recent commits' patch-ids.
-            def get_patch_id(commit_hash):
-                try:
-                    # Use bytes to avoid encoding errors on Windows
-                    diff = subprocess.run(['git', 'show', commit_hash], stdout=subprocess.PIPE, check=True)
-                    p = subprocess.run(['git', 'patch-id', '--stable'], input=diff.stdout, stdout=subprocess.PIPE, check=True)
-                    out = p.stdout.decode('utf-8', errors='ignore').strip()
-                    if out:
-                        return out.split()[0]
-                except Exception:
-                    return None
-            tag_pid = get_patch_id(tag_commit_hash)
+            # but the same patch; compare with recent commits' patch-ids.
+            tag_pid = self.get_patch_id(tag_commit_hash)
             if not tag_pid:
                 continue
-            # Precompute recent commits patch-ids once
-            recent_patch_ids = {}
-            for recent in commits:
-                try:
-                    pid = get_patch_id(recent.hexsha)
-                    if pid:
-                        recent_patch_ids[recent.hexsha] = pid
-                except Exception:
-                    continue
-            for recent_hash, pid in recent_patch_ids.items():
-                if pid == tag_pid:
+            for recent_hash in commit_hashes:
+                if self.get_patch_id(recent_hash) == tag_pid:
                     if recent_hash not in tags_by_commit:
                         tags_by_commit[recent_hash] = []
                     for t in tag_names:
                         if t not in tags_by_commit[recent_hash]:
                             tags_by_commit[recent_hash].append(t)
+                    methods[tag_commit_hash] = ('patch-id', recent_hash)
+                    break
+        
+        self.tag_stats = {
+            'tags': len(tag_targets),
+            'lookups': sum(1 for target in tag_targets.values()
+                           if target not in commits_hashes and target not in surviving_above),
+            'cached': sum(1 for target in tag_targets.values() if target in cached_targets),
+            'patch_ids': len(self._patch_id_lookups),
+            'patch_ids_cached': len(self._patch_id_hits)
+        }
+        if cache:
+            for name, target in tag_targets.items():
+                method, attached = methods[target]
+                cache.set(name, target, method, attached, head)
+            cache.prune(tag_targets)
+            cache.save()
+        
+        return tags_by_commit
+    
+    def _walk_gitpython(self, num_commits, branch, first_parent, git_filters=None):
+        """
+        Commit source using GitPython objects.
+        
+        Stats are computed lazily per commit (one git diff per commit);
+        trailers come from one streamed git log call (see iter_commits_with_trailers).
+        
+        Args:
+            num_commits: Maximum number of commits (None walks the whole branch)
+            branch: Branch name to walk
+            first_parent: Only follow first parents of merges
+            git_filters: Extra rev-list keyword options (see git_exclude_filters)
+        
+        Yields:
+            Raw commit records (see iter_commits)
+        """
+        options = dict(git_filters or {}, max_count=num_commits)
+        if first_parent:
+            options['first_parent'] = True
+        
+        for commit, trailers in iter_commits_with_trailers(self.repo, branch, **options):
+            yield {
+                'hash': commit.hexsha,
+                'author': commit.author.name,
+                'email': commit.author.email,
+                'timestamp': commit.authored_date,
+                'message': commit.message,
+                'trailers': trailers,
+                'stats': lambda commit=commit: (
+                    len(commit.stats.files),
+                    commit.stats.total['insertions'],
+                    commit.stats.total['deletions']
+                )
+            }
+    
+    def _walk_log(self, num_commits, branch, first_parent, git_filters=None):
+        """
+        Commit source using a single streamed `git log --numstat` call.
+        
+        Stats and trailers for the whole range come from the same process,
+        merge commits are diffed against their first parent (like GitPython's
+        commit.stats).
+        
+        Args:
+            num_commits: Maximum number of commits (None walks the whole branch)
+            branch: Branch name to walk
+            first_parent: Only follow first parents of merges
+            git_filters: Extra rev-list keyword options (see git_exclude_filters)
+        
+        Yields:
+            Raw commit records (see iter_commits)
+        """
+        args = [
+            'git', 'log', branch,
+            f'--format=%x1e%H%x1f%an%x1f%ae%x1f%at%x1f%B%x1f{TRAILERS_FORMAT}%x1f',
+            '--numstat', '--no-renames', '--diff-merges=first-parent'
+        ]
+        if num_commits is not None:
+            args.append(f'--max-count={num_commits}')
+        if first_parent:
+            args.append('--first-parent')
+        args += self.repo.git.transform_kwargs(**(git_filters or {}))
+        
+        for raw in _stream_git_records(args, cwd=self.repo.working_tree_dir or self.repo.git_dir):
+            commit_hash, author, email, timestamp, message, trailers, numstat = raw.split('\x1f', 6)
+            files_changed = insertions = deletions = 0
+            for line in numstat.splitlines():
+                parts = line.split('\t')
+                if len(parts) < 3:
+                    continue
+                files_changed += 1
+                # Binary files are reported as '-' (counted as 0 lines, like GitPython)
+                insertions += int(parts[0]) if parts[0].isdigit() else 0
+                deletions += int(parts[1]) if parts[1].isdigit() else 0
+            yield {
+                'hash': commit_hash,
+                'author': author,
+                'email': email,
+                'timestamp': int(timestamp),
+                'message': message,
+                'trailers': parse_trailers_field(trailers),
+                'stats': lambda stats=(files_changed, insertions, deletions): stats
+            }
+    
+    def iter_commits(self, num_commits=10, branch='main',
+                     exclude_title_patterns=None,
+                     exclude_author_patterns=None,
+                     exclude_message_patterns=None,
+                     first_parent=False,
+                     nest_merged=False,
+                     engine='gitpython',
+                     fill_after_exclude=False,
+                     exclude_trailer_patterns=None):
+        """
+        Iterate over the last N commits of a branch as commit dictionaries.
+        
+        Tags are resolved for the whole range up front; with the gitpython
+        engine, per-commit stats are only computed as the iterator is consumed.
+        A tag on an excluded commit of the walked range moves to the nearest
+        surviving commit above it (see resolve_tags).
+        
+        By default N commits are walked and excluded commits are then dropped.
+        With fill_after_exclude the walk continues until N commits survive the
+        exclude patterns, and the walked range extends over the excluded
+        commits that follow, up to the next surviving one; the author/message
+        patterns git can evaluate are passed to the walk itself, so those
+        commits are never loaded.
+        
+        Args:
+            num_commits: Number of commits to retrieve
+            branch: Branch name to analyze
+            first_parent: Only walk mainline commits (follow first parents of merges).
+                Merge commit stats are computed against their first parent.
+            nest_merged: With first_parent, list the commits brought in by each merge
+                under its 'merged_commits' key
+            engine: Extraction engine, one of EXTRACTION_ENGINES ('gitpython' walks
+                GitPython objects, 'log' streams one git log call with batched stats)
+            fill_after_exclude: Return N commits that pass the exclude patterns
+                (instead of the non-excluded commits among the last N)
+            exclude_trailer_patterns: 'Key=regex' trailer excludes (see should_exclude_commit)
+        
+        Yields:
+            Commit dictionaries with metadata
+        """
+        if engine not in EXTRACTION_ENGINES:
+            raise ValueError(f"Unknown extraction engine '{engine}' (expected one of: {', '.join(EXTRACTION_ENGINES)})")
+        
+        repo = self.repo
+        walk = getattr(self, EXTRACTION_ENGINES[engine])
+        exclude_patterns = {
+            'exclude_title_patterns': exclude_title_patterns,
+            'exclude_author_patterns': exclude_author_patterns,
+            'exclude_message_patterns': exclude_message_patterns,
+            'exclude_trailer_patterns': exclude_trailer_patterns,
+        }
+        
+        if fill_after_exclude and any(exclude_patterns.values()):
+            git_filters = {}
+            if self.push_down_excludes and self.supports_perl_regexp():
+                git_filters = git_exclude_filters(exclude_author_patterns, exclude_message_patterns)
+            records = []
+            window = []
+            next_hash = None
+            # Stream the branch and stop (killing the walk) at the first surviving commit past N,
+            # keeping the excluded commits before it in the walked range
+            for record in walk(None, branch, first_parent, git_filters):
+                first_line = record['message'].strip().split('\n')[0]
+                excluded = should_exclude_commit(first_line, record['author'], record['message'],
+                                                 trailers=record['trailers'], **exclude_patterns)
+                if len(records) >= num_commits and (not excluded or not records):
+                    next_hash = record['hash']
                     break
+                window.append(record['hash'])
+                if not excluded:
+                    records.append(record)
+            if git_filters and records:
+                # Commits dropped by git itself are not walked: list the range without the filters
+                window = []
+                rev_list = ['git', 'rev-list', branch] + (['--first-parent'] if first_parent else [])
+                for commit_hash in _stream_git_records(rev_list, cwd=repo.working_tree_dir or repo.git_dir,
+                                                       separator=b'\n'):
+                    if commit_hash == next_hash:
+                        break
+                    window.append(commit_hash)
+        else:
+            records = []
+            window = []
+            for record in walk(num_commits, branch, first_parent):
+                window.append(record['hash'])
+                if not should_exclude_commit(record['message'].strip().split('\n')[0], record['author'],
+                                             record['message'], trailers=record['trailers'], **exclude_patterns):
+                    records.append(record)
+        # In both modes tags on excluded commits of the walked range move to the nearest
+        # surviving commit above them (dropped if there is none), whichever filter excluded them
+        tags_by_commit = self.resolve_tags([record['hash'] for record in records], window)
         
-        for commit in commits:
+        for record in records:
             # Extract commit type and scope from conventional commit format
-            message_lines = commit.message.strip().split('\n')
+            message_lines = record['message'].strip().split('\n')
             first_line = message_lines[0]
-
-            if should_exclude_commit(
-                first_line,
-                commit.author.name,
-                commit.message,
-                exclude_title_patterns=exclude_title_patterns,
-                exclude_author_patterns=exclude_author_patterns,
-                exclude_message_patterns=exclude_message_patterns,
-            ):
-                continue
             
-            # Classify commit with conventional prefix + heuristics
-            commit_type = classify_commit(first_line, commit.author.name, commit.message)
+            # Classify commit with Type: trailer, conventional prefix + heuristics
+            commit_type = classify_commit(first_line, record['author'], record['message'], record['trailers'])
             
             # Get tags for this commit
-            commit_tags = tags_by_commit.get(commit.hexsha, [])
+            commit_tags = tags_by_commit.get(record['hash'], [])
             
+            files_changed, insertions, deletions = record['stats']()
             commit_data = {
-                'hash': commit.hexsha,
-                'short_hash': commit.hexsha[:7],
-                'author': commit.author.name,
-                'email': commit.author.email,
-                'timestamp': commit.authored_date,
-                'message': commit.message.strip(),
+                'hash': record['hash'],
+                'short_hash': record['hash'][:7],
+                'author': record['author'],
+                'email': record['email'],
+                'timestamp': record['timestamp'],
+                'message': record['message'].strip(),
                 'message_short': first_line[:100],
                 'type': commit_type,
-                'files_changed': len(commit.stats.files),
-                'insertions': commit.stats.total['insertions'],
-                'deletions': commit.stats.total['deletions']
+                'files_changed': files_changed,
+                'insertions': insertions,
+                'deletions': deletions
             }
             
             # Add tags only if present
             if commit_tags:
                 commit_data['tags'] = sorted(commit_tags)
             
-            commits_data.append(commit_data)
+            # Add trailers (Key: [values]) only if present
+            if record['trailers']:
+                commit_data['trailers'] = record['trailers']
+            
+            # Fold merged branch commits under their merge (first-parent mode only)
+            if first_parent and nest_merged:
+                merged_commits = get_merged_commits(
+                    repo,
+                    repo.commit(record['hash']),
+                    exclude_title_patterns=exclude_title_patterns,
+                    exclude_author_patterns=exclude_author_patterns,
+                    exclude_message_patterns=exclude_message_patterns,
+                    exclude_trailer_patterns=exclude_trailer_patterns,
+                )
+                if merged_commits:
+                    commit_data['merged_commits'] = merged_commits
+            
+            yield commit_data
+    
+    def get_commits(self, num_commits=10, branch='main', **options):
+        """Return the list produced by iter_commits (same arguments)."""
+        return list(self.iter_commits(num_commits, branch, **options))
+    
+    def get_repository_info(self, branch='main'):
+        """
+        Get repository name, branch and browsable remote URL.
+        
+        Args:
+            branch: Branch name reported in the info
+        
+        Returns:
+            Dictionary with 'name', 'branch' and 'url' keys
+        """
+        if 'url' not in self._repository_info:
+            try:
+                remote_url = self.repo.remotes.origin.url
+                # Convert SSH to HTTPS if needed
+                if remote_url.startswith('git@'):
+                    remote_url = remote_url.replace(':', '/').replace('git@', 'https://')
+                if remote_url.endswith('.git'):
+                    remote_url = remote_url[:-4]
+            except:
+                remote_url = ''
             
+            # Get repository name from path or remote URL
+            repo_name = Path(self.repo_path).name
+            if not repo_name or repo_name == '.':
+                if remote_url:
+                    repo_name = remote_url.split('/')[-1]
+                else:
+                    repo_name = 'Repository'
+            self._repository_info = {'name': repo_name, 'url': remote_url}
+        
+        return {
+            'name': self._repository_info['name'],
+            'branch': branch,
+            'url': self._repository_info['url']
+        }
+    
+    def get_release_stats(self, commits, max_workers=None):
+        """
+        Compute net diff stats per release with one `git diff --shortstat` each.
+        
+        Each release is diffed from the commit right after its slice in the
+        walked commit list (the tip of the previous, older release in walk
+        order, whatever the author dates say) to its own tip, so a file
+        touched by many commits counts once. The oldest release is diffed from
+        the parent of its oldest commit (the empty tree for a root commit;
+        skipped at a shallow clone boundary). Diffs run in parallel.
+        
+        Args:
+            commits: Commit dictionaries in walk order (newest first), as in release_data
+            max_workers: Number of concurrent git processes (default: CPU count, at most 8)
+        
+        Returns:
+            Dictionary mapping release tag to a dictionary with 'base', 'head',
+            'files_changed', 'insertions' and 'deletions'
+        """
+        position = {commit['hash']: index for index, commit in enumerate(commits)}
+        ranges = {}
+        for release in parse_releases(commits):
+            if not release['commits']:
+                continue
+            end = position[release['commits'][-1]['hash']] + 1
+            if end < len(commits):
+                base = commits[end]['hash']
+            else:
+                oldest = self.repo.commit(release['commits'][-1]['hash'])
+                if oldest.parents:
+                    base = oldest.parents[0].hexsha
+                elif self.is_shallow():
+                    continue
+                else:
+                    base = self.repo.git.hash_object('-t', 'tree', '--stdin', istream=subprocess.DEVNULL)
+            ranges[release['tag']] = (base, release['commits'][0]['hash'])
+        
+        cwd = self.repo.working_tree_dir or self.repo.git_dir
+        
+        def shortstat(revisions):
+            output = subprocess.run(
+                ['git', 'diff', '--shortstat', '--no-renames', *revisions],
+                cwd=cwd, capture_output=True, text=True, check=True
+            ).stdout
+            counts = {}
+            for key, pattern in (('files_changed', r'(\d+) files? changed'),
+                                 ('insertions', r'(\d+) insertions?\(\+\)'),
+                                 ('deletions', r'(\d+) deletions?\(-\)')):
+                match = re.search(pattern, output)
+                counts[key] = int(match.group(1)) if match else 0
+            return counts
+        
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(shortstat, ranges.values())
+            return {
+                tag: {'base': base, 'head': head, **counts}
+                for (tag, (base, head)), counts in zip(ranges.items(), results)
+            }
+    
+    def build(self, num_commits=10, branch='main', net_release_stats=False, **options):
+        """
+        Build the release data dictionary (the content of release_notes.json).
+        
+        Args:
+            num_commits: Number of commits to retrieve
+            branch: Branch name to analyze
+            net_release_stats: Add net diff stats per release under 'release_stats'
+                (see get_release_stats)
+            **options: Extra iter_commits options (exclude patterns, first_parent, ...)
+        
+        Returns:
+            Release data dictionary
+        """
+        commits = self.get_commits(num_commits, branch, **options)
+        release_data = {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'generated_at_iso': datetime.now().isoformat(),
+            'repository': self.get_repository_info(branch),
+            'commits': commits
+        }
+        if net_release_stats:
+            release_data['release_stats'] = self.get_release_stats(commits)
+        return release_data
+    
+    def get_releases(self, release_data):
+        """Return the releases of release data (see get_release_data_releases)."""
+        return get_release_data_releases(from_columnar_release_data(release_data))
+    
+    def render_json(self, release_data, json_format='default'):
+        """
+        Render release data as the JSON string written to release_notes.json.
+        
+        Args:
+            release_data: Release data dictionary
+            json_format: 'default' (one object per commit, indented) or
+                'columnar' (compact per-field arrays, see to_columnar_release_data)
+        
+        Returns:
+            JSON string
+        """
+        if json_format == 'columnar':
+            return json.dumps(to_columnar_release_data(release_data), separators=(',', ':'), ensure_ascii=False)
+        return json.dumps(release_data, indent=2, ensure_ascii=False)
+    
+    def render_markdown(self, release_data, latest_release_only=False, include_timeline=False, timeline_max_commits=None):
+        """Render release data as markdown (see generate_markdown)."""
+        return generate_markdown(release_data, latest_release_only=latest_release_only, include_timeline=include_timeline,
+                                 timeline_max_commits=timeline_max_commits)
+
+
+def get_repository_commits(repo_path, num_commits=10, branch='main',exclude_title_patterns=None,
+                           exclude_author_patterns=None,
+                           exclude_message_patterns=None,
+                           first_parent=False,
+                           nest_merged=False,
+                           fill_after_exclude=False,
+                           exclude_trailer_patterns=None):
+    """
+    Extract last N commits from the current repository.
+    
+    Args:
+        repo_path: Path to the git repository
+        num_commits: Number of commits to retrieve
+        branch: Branch name to analyze
+        first_parent: Only walk mainline commits (follow first parents of merges).
+            Merge commit stats are computed against their first parent.
+        nest_merged: With first_parent, list the commits brought in by each merge
+            under its 'merged_commits' key
+        fill_after_exclude: Keep walking until N commits pass the exclude patterns
+        exclude_trailer_patterns: 'Key=regex' trailer excludes (see should_exclude_commit)
+    
+    Returns:
+        List of commit dictionaries with metadata
+    """
+    try:
+        with ReleaseNotesBuilder(repo_path) as builder:
+            return builder.get_commits(
+                num_commits,
+                branch,
+                exclude_title_patterns=exclude_title_patterns,
+                exclude_author_patterns=exclude_author_patterns,
+                exclude_message_patterns=exclude_message_patterns,
+                first_parent=first_parent,
+                nest_merged=nest_merged,
+                fill_after_exclude=fill_after_exclude,
+                exclude_trailer_patterns=exclude_trailer_patterns,
+            )
     except Exception as e:
         print(f"[ERROR] Failed to process repository: {e}")
         raise
-    
-    return commits_data
 
 
-def export_release_notes(repo_path, num_commits, output_path, branch='main', markdown_path=None, latest_release_only=False, include_timeline=False, exclude_title_patterns=None, exclude_author_patterns=None,exclude_message_patterns=None):
+def export_release_notes(repo_path, num_commits, output_path, branch='main', markdown_path=None, latest_release_only=False, include_timeline=False, exclude_title_patterns=None, exclude_author_patterns=None,exclude_message_patterns=None, first_parent=False, nest_merged=False, deepen_shallow=False, json_format='default', charts_dir=None, engine='gitpython', write_commit_graph=False, tag_cache=None, fill_after_exclude=False, timeline_max_commits=None, delta_path=None, delta_previous_path=None, net_release_stats=False, exclude_trailer_patterns=None, fragments_dir=None, deepen_max_depth=DEEPEN_MAX_DEPTH):
     """
     Export commit messages from current repository to JSON for release notes.
     
@@ -301,53 +1538,127 @@ def export_release_notes(repo_path, num_commits, output_path, branch='main', mar
         markdown_path: Optional path to save markdown file
         latest_release_only: Only include latest release in markdown
         include_timeline: Include timeline visualization in markdown
+        first_parent: Only walk mainline (first-parent) commits
+        nest_merged: Fold merged branch commits under their merge commit
+        deepen_shallow: Deepen a shallow clone as far as needed before extracting
+        json_format: 'default' or 'columnar' JSON output
+        charts_dir: Optional directory to pre-render SVG charts into
+        engine: Extraction engine (see EXTRACTION_ENGINES)
+        write_commit_graph: Write a commit-graph file if the repository has none
+        tag_cache: Optional tag attachment cache file (True for the default location)
+        fill_after_exclude: Export N commits that pass the exclude patterns
+        timeline_max_commits: Bucket markdown timeline commits by day/week above this many per release
+        delta_path: Optional path to write the changes since the previous export to
+            (see build_release_delta)
+        delta_previous_path: Previous export to compare with (default: the existing output_path)
+        net_release_stats: Compute net diff stats per release (one git diff per release)
+        exclude_trailer_patterns: 'Key=regex' trailer excludes (see should_exclude_commit)
+        fragments_dir: Optional directory to write pre-rendered HTML release fragments into
+        deepen_max_depth: With deepen_shallow, stop looking for release tags at this many commits
     """
-    print(f"[*] Extracting {num_commits} commits from branch '{branch}'...")
+    mode = ' (first-parent)' if first_parent else ''
+    if fill_after_exclude:
+        mode += ' (after exclusions)'
+    print(f"[*] Extracting {num_commits} commits from branch '{branch}'{mode}...")
     
-    commits = get_repository_commits(repo_path, num_commits, branch,exclude_title_patterns=exclude_title_patterns,
-        exclude_author_patterns=exclude_author_patterns,
-        exclude_message_patterns=exclude_message_patterns)
-    
-    # Get repository info
-    repo = git.Repo(repo_path)
+    builder = None
     try:
-        remote_url = repo.remotes.origin.url
-        # Convert SSH to HTTPS if needed
-        if remote_url.startswith('git@'):
-            remote_url = remote_url.replace(':', '/').replace('git@', 'https://')
-        if remote_url.endswith('.git'):
-            remote_url = remote_url[:-4]
-    except:
-        remote_url = ''
-    
-    # Get repository name from path or remote URL
-    repo_name = Path(repo_path).name
-    if not repo_name or repo_name == '.':
-        if remote_url:
-            repo_name = remote_url.split('/')[-1]
-        else:
-            repo_name = 'Repository'
+        builder = ReleaseNotesBuilder(repo_path, write_commit_graph=write_commit_graph, tag_cache_path=tag_cache)
+        if deepen_shallow:
+            report = builder.ensure_history(num_commits, branch, max_depth=deepen_max_depth)
+            if report['shallow']:
+                print(f"[*] Shallow clone: fetched {report['deepened_by']} more commits in {report['fetches']} fetch(es), "
+                      f"{report['available_commits']} available, {len(report['tags_fetched'])} release tag(s) fetched"
+                      f"{'' if report['complete'] else ' (still shallow)'}")
+            if report['tags_missing']:
+                print(f"[WARN] {len(report['tags_missing'])} release tag(s) not reached within {deepen_max_depth} commits "
+                      f"({', '.join(report['tags_missing'][:5])}{', ...' if len(report['tags_missing']) > 5 else ''}): "
+                      f"they are missing from the release notes (raise --deepen_max_depth or fetch the full history)")
+        elif builder.is_shallow():
+            print("[WARN] Shallow clone detected: history and release tags may be truncated (use --deepen_shallow)")
+        release_data = builder.build(
+            num_commits,
+            branch,
+            exclude_title_patterns=exclude_title_patterns,
+            exclude_author_patterns=exclude_author_patterns,
+            exclude_message_patterns=exclude_message_patterns,
+            first_parent=first_parent,
+            nest_merged=nest_merged,
+            engine=engine,
+            fill_after_exclude=fill_after_exclude,
+            net_release_stats=net_release_stats,
+            exclude_trailer_patterns=exclude_trailer_patterns,
+        )
+    except Exception as e:
+        print(f"[ERROR] Failed to process repository: {e}")
+        raise
+    finally:
+        if builder is not None:
+            builder.close()
+    
+    if builder.tag_cache:
+        stats = builder.tag_stats
+        print(f"[*] Release tags: {stats.get('cached', 0)} of {stats.get('lookups', 0)} out-of-range tag(s) reused, "
+              f"{stats.get('patch_ids_cached', 0)} of {stats.get('patch_ids', 0)} patch-id lookup(s) served "
+              f"from {builder.tag_cache.path}")
+    
+    # Pre-render charts, referenced from the JSON relative to its location
+    if charts_dir:
+        chart_files, rendered = render_charts(release_data, charts_dir)
+        json_dir = Path(output_path).resolve().parent
+        release_data['charts'] = {
+            name: Path(os.path.relpath(path.resolve(), json_dir)).as_posix()
+            for name, path in chart_files.items()
+        }
+        print(f"[OK] Charts in {charts_dir}: {len(rendered)} rendered, {len(chart_files) - len(rendered)} unchanged")
+    
+    # Pre-render release HTML fragments, referenced the same way
+    if fragments_dir:
+        fragment_files = write_release_fragments(release_data, fragments_dir)
+        json_dir = Path(output_path).resolve().parent
+        release_data['fragments'] = {
+            tag: Path(os.path.relpath(path.resolve(), json_dir)).as_posix()
+            for tag, path in fragment_files.items()
+        }
+        print(f"[OK] HTML fragments in {fragments_dir}: {len(fragment_files)} release(s)")
     
-    release_data = {
-        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'generated_at_iso': datetime.now().isoformat(),
-        'repository': {
-            'name': repo_name,
-            'branch': branch,
-            'url': remote_url
-        },
-        'commits': commits
-    }
+    # Load the previous export before it is overwritten
+    if delta_path:
+        previous_path = Path(delta_previous_path or output_path)
+        previous_data = None
+        if previous_path.exists():
+            try:
+                previous_data = json.loads(previous_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable previous export {previous_path}: {e}")
+        else:
+            print(f"[WARN] No previous export at {previous_path}: delta will be empty")
     
     # Save to JSON file
+    json_content = builder.render_json(release_data, json_format=json_format)
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(release_data, f, indent=2, ensure_ascii=False)
+        f.write(json_content)
+    
+    print(f"[OK] Exported {len(release_data['commits'])} commits to {output_path}")
     
-    print(f"[OK] Exported {len(commits)} commits to {output_path}")
+    if json_format == 'columnar':
+        default_size = len(builder.render_json(release_data).encode('utf-8'))
+        columnar_size = len(json_content.encode('utf-8'))
+        reduction = (1 - columnar_size / default_size) * 100 if default_size else 0
+        print(f"[OK] Columnar JSON: {columnar_size} bytes vs {default_size} bytes in default format ({reduction:.1f}% smaller)")
+    
+    if delta_path:
+        delta = build_release_delta(previous_data, release_data)
+        delta_content = json.dumps(delta, indent=2, ensure_ascii=False)
+        with open(delta_path, 'w', encoding='utf-8') as f:
+            f.write(delta_content)
+        print(f"[OK] Delta: {len(delta['commits_added'])} new commit(s), {len(delta['releases_added'])} new release(s), "
+              f"{len(delta['commits_released'])} commit(s) released, {len(delta_content.encode('utf-8'))} bytes in {delta_path}")
     
     # Generate markdown file if requested
     if markdown_path:
-        markdown_content = generate_markdown(release_data, latest_release_only=latest_release_only, include_timeline=include_timeline)
+        markdown_content = builder.render_markdown(release_data, latest_release_only=latest_release_only, include_timeline=include_timeline,
+                                                   timeline_max_commits=timeline_max_commits)
         with open(markdown_path, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
         print(f"[OK] Generated markdown file: {markdown_path}")
@@ -355,7 +1666,7 @@ def export_release_notes(repo_path, num_commits, output_path, branch='main', mar
     return release_data
 
 
-def generate_markdown(release_data, latest_release_only=False, include_timeline=False):
+def generate_markdown(release_data, latest_release_only=False, include_timeline=False, timeline_max_commits=None):
     """
     Generate markdown formatted release notes from release data.
     
@@ -363,10 +1674,13 @@ def generate_markdown(release_data, latest_release_only=False, include_timeline=
         release_data: Dictionary containing release note data
         latest_release_only: Only include latest release
         include_timeline: Include timeline visualization
+        timeline_max_commits: Bucket timeline commits by day/week above this many
+            per release, keeping the timeline size bounded (None lists every commit)
     
     Returns:
         Markdown formatted string
     """
+    release_data = from_columnar_release_data(release_data)
     md_lines = []
     
     # Header
@@ -382,7 +1696,13 @@ def generate_markdown(release_data, latest_release_only=False, include_timeline=
     md_lines.append("")
     
     # Check if there are release tags (tags starting with v or V or (SemVer format: MAJOR.MINOR.PATCH))
-    releases = parse_releases(release_data['commits'])
+    releases = get_release_data_releases(release_data)
+    
+    # Net diff stats per release, if computed (see ReleaseNotesBuilder.get_release_stats)
+    release_stats = release_data.get('release_stats', {})
+    for release in releases:
+        if release['tag'] in release_stats:
+            release['net_stats'] = release_stats[release['tag']]
     
     if releases:
         if latest_release_only:
@@ -390,83 +1710,405 @@ def generate_markdown(release_data, latest_release_only=False, include_timeline=
             if latest_release:
                 releases = [latest_release]
         # Structure by releases
-        md_lines.extend(generate_markdown_by_release(releases, release_data, include_timeline=include_timeline))
+        md_lines.extend(generate_markdown_by_release(releases, release_data, include_timeline=include_timeline,
+                                                     timeline_max_commits=timeline_max_commits))
     else:
         # Structure by commit type (original behavior)
-        md_lines.extend(generate_markdown_by_type(release_data, include_timeline=include_timeline))
+        md_lines.extend(generate_markdown_by_type(release_data, include_timeline=include_timeline,
+                                                  timeline_max_commits=timeline_max_commits))
     
     return '\n'.join(md_lines)
 
 
-def parse_releases(commits):
+def release_ranges(commits):
+    """
+    Locate releases in a commit list based on tags starting with 'v' or 'V' or SemVer format: MAJOR.MINOR.PATCH
+    
+    Args:
+        commits: List of commit dictionaries (newest first)
+    
+    Returns:
+        List of release ranges in commit order ('Incoming' first), each a
+        dictionary with 'tag', 'start', 'end' ([start, end) indices into
+        commits) and 'is_virtual'; empty list if no release tags found
+    """
+    # Build a map of tags with their first appearance index
+    tag_first_index = {}
+    
+    for index, commit in enumerate(commits):
+        if 'tags' in commit and commit['tags']:
+            for tag in commit['tags']:
+                if tag not in tag_first_index:
+                    tag_first_index[tag] = index
+    
+    # Filter to only include release tags (starting with 'v' or 'V' or SemVer format: MAJOR.MINOR.PATCH)
+    release_tags = [tag for tag in tag_first_index.keys() if is_semver_tag(tag)]
+    
+    if not release_tags:
+        return []
+    
+    # Get unique commit indices where release tags appear (in order)
+    unique_indices = sorted(set(tag_first_index[tag] for tag in release_tags))
+    
+    # For each unique index, collect all release tags that appear at that index
+    tag_groups = []
+    for index in unique_indices:
+        tags_at_index = [tag for tag in release_tags if tag_first_index[tag] == index]
+        tag_groups.append({'index': index, 'tags': tags_at_index})
+    
+    ranges = []
+    
+    # Check for commits before the first tag (Incoming commits)
+    if tag_groups and tag_groups[0]['index'] > 0:
+        ranges.append({'tag': 'Incoming', 'start': 0, 'end': tag_groups[0]['index'], 'is_virtual': True})
+    
+    # Process each release
+    for i, current_group in enumerate(tag_groups):
+        next_group = tag_groups[i + 1] if i < len(tag_groups) - 1 else None
+        ranges.append({
+            'tag': ' / '.join(current_group['tags']),  # Merge multiple tags on same commit
+            'start': current_group['index'],
+            'end': next_group['index'] if next_group else len(commits),
+            'is_virtual': False
+        })
+    
+    return ranges
+
+
+def releases_from_ranges(commits, ranges):
+    """
+    Build release dictionaries from release ranges (see release_ranges).
+    
+    Args:
+        commits: List of commit dictionaries the ranges index into
+        ranges: List of release ranges
+    
+    Returns:
+        List of release dictionaries, most recent first
+    """
+    releases_list = []
+    for release_range in ranges:
+        release_commits = commits[release_range['start']:release_range['end']]
+        releases_list.append({
+            'tag': release_range['tag'],
+            'commits': release_commits,
+            'start_date': timestamp_to_date(release_commits[0]['timestamp']) if release_commits else '',
+            'end_date': timestamp_to_date(release_commits[-1]['timestamp']) if release_commits else '',
+            'commit_count': len(release_commits),
+            'is_virtual': release_range['is_virtual']
+        })
+    
+    # Sort by date (most recent first)
+    releases_list.sort(key=lambda r: r['start_date'] if r['start_date'] else '', reverse=True)
+    
+    return releases_list
+
+
+def parse_releases(commits):
+    """
+    Parse commits to identify releases based on tags starting with 'v' or 'V' or SemVer format: MAJOR.MINOR.PATCH
+    
+    Args:
+        commits: List of commit dictionaries
+    
+    Returns:
+        List of release dictionaries or empty list if no release tags found
+    """
+    return releases_from_ranges(commits, release_ranges(commits))
+
+
+def get_release_data_releases(release_data):
+    """
+    Return the releases of release data.
+    
+    Columnar exports carry the releases as index ranges ('release_ranges'
+    once expanded by from_columnar_release_data), which are used as-is;
+    otherwise releases are parsed from the commit tags.
+    
+    Args:
+        release_data: Release data dictionary (default format or expanded columnar)
+    
+    Returns:
+        List of release dictionaries, most recent first
+    """
+    if 'release_ranges' in release_data:
+        return releases_from_ranges(release_data['commits'], release_data['release_ranges'])
+    return parse_releases(release_data['commits'])
+
+
+def build_release_delta(previous_data, release_data):
+    """
+    Compare release data with a previous export and list what was published since.
+    
+    The delta is small enough to be polled instead of the full release notes:
+    commits that are new, releases with a tag that was not there before, and
+    commits that were in the 'Incoming' release and are now part of a tagged one.
+    
+    Only commits above the previous window's oldest commit count as new: a
+    larger window (or changed excludes) can bring older commits and releases
+    in from below, and those were not published since the previous run. When
+    the previous export had no release at all, all its commits were incoming.
+    
+    Args:
+        previous_data: Release data of the previous run (default or columnar
+            format), or None for a first run (empty delta)
+        release_data: Current release data
+    
+    Returns:
+        Delta dictionary
+    """
+    release_data = from_columnar_release_data(release_data)
+    delta = {
+        'format': 'delta',
+        'format_version': 1,
+        'generated_at': release_data['generated_at'],
+        'generated_at_iso': release_data.get('generated_at_iso'),
+        'previous_generated_at_iso': None,
+        'repository': release_data['repository'],
+        'commits_added': [],
+        'releases_added': [],
+        'commits_released': []
+    }
+    if previous_data is None:
+        return delta
+    
+    previous_data = from_columnar_release_data(previous_data)
+    delta['previous_generated_at_iso'] = previous_data.get('generated_at_iso')
+    previous_hashes = {commit['hash'] for commit in previous_data['commits']}
+    previous_tags = {tag for commit in previous_data['commits'] for tag in commit.get('tags', [])}
+    previous_releases = get_release_data_releases(previous_data)
+    if previous_releases:
+        previous_incoming = {
+            commit['hash']
+            for release in previous_releases if release['is_virtual']
+            for commit in release['commits']
+        }
+    else:
+        previous_incoming = set(previous_hashes)
+    
+    # Commits are newest first: anything below the oldest commit shared with
+    # the previous window was already in the history before the previous run
+    commits = release_data['commits']
+    position = {commit['hash']: index for index, commit in enumerate(commits)}
+    shared = [index for index, commit in enumerate(commits) if commit['hash'] in previous_hashes]
+    boundary = shared[-1] if shared else len(commits)
+    
+    for commit in commits[:boundary]:
+        if commit['hash'] in previous_hashes:
+            continue
+        added = {key: commit[key] for key in ('hash', 'short_hash', 'author', 'timestamp', 'message_short', 'type')}
+        if commit.get('tags'):
+            added['tags'] = commit['tags']
+        delta['commits_added'].append(added)
+    
+    for release in get_release_data_releases(release_data):
+        if release['is_virtual']:
+            continue
+        tags = release['tag'].split(' / ')
+        newly_tagged = any(tag not in previous_tags for tag in tags)
+        if newly_tagged and release['commits'] and position[release['commits'][0]['hash']] <= boundary:
+            delta['releases_added'].append({
+                'tag': release['tag'],
+                'start_date': release['start_date'],
+                'end_date': release['end_date'],
+                'commit_count': release['commit_count'],
+                'commits': [commit['hash'] for commit in release['commits']]
+            })
+        for commit in release['commits']:
+            if commit['hash'] in previous_incoming:
+                delta['commits_released'].append({
+                    'hash': commit['hash'],
+                    'short_hash': commit['short_hash'],
+                    'tag': release['tag']
+                })
+    
+    return delta
+
+
+def generate_merged_commits_markdown(commit, repo_url):
+    """
+    Generate nested markdown lines for commits folded under a merge commit.
+    
+    Args:
+        commit: Commit dictionary (may contain 'merged_commits')
+        repo_url: Repository URL used to build commit links
+    
+    Returns:
+        List of markdown lines (empty if the commit has no merged commits)
+    """
+    md_lines = []
+    for merged in commit.get('merged_commits', []):
+        if repo_url:
+            commit_link = f"[`{merged['short_hash']}`]({repo_url}/commit/{merged['hash']})"
+        else:
+            commit_link = f"`{merged['short_hash']}`"
+        emoji = get_type_emoji(merged.get('type', 'other'))
+        md_lines.append(f"  - ↳ {emoji} {merged['message_short']} ({commit_link}) - *{merged['author']}*")
+    return md_lines
+
+
+def to_columnar_release_data(release_data):
     """
-    Parse commits to identify releases based on tags starting with 'v' or 'V' or SemVer format: MAJOR.MINOR.PATCH
+    Convert release data to the compact columnar JSON format.
+    
+    Commits are stored as one array per field, authors/emails and types are
+    deduplicated into tables referenced by index (merged commits included),
+    values derivable from other fields (short_hash, message_short) are
+    dropped, sparse fields (tags, trailers, merged_commits) are keyed by
+    commit index, and releases are stored as [start, end) index ranges into
+    the commit arrays, which readers use instead of re-deriving them from tags.
     
     Args:
-        commits: List of commit dictionaries
+        release_data: Release data dictionary (default format)
     
     Returns:
-        List of release dictionaries or empty list if no release tags found
+        Columnar release data dictionary
     """
-    # Build a map of tags with their first appearance index
-    tag_first_index = {}
+    commits = release_data['commits']
+    
+    authors = []
+    author_index = {}
+    # Merged commits only carry the author name: reuse the first entry with that name
+    author_name_index = {}
+    types = []
+    type_index = {}
+    columns = {
+        'hash': [],
+        'author': [],
+        'timestamp': [],
+        'message': [],
+        'type': [],
+        'files_changed': [],
+        'insertions': [],
+        'deletions': []
+    }
+    tags = {}
+    trailers = {}
+    merged_commits = {}
     
     for index, commit in enumerate(commits):
-        if 'tags' in commit and commit['tags']:
-            for tag in commit['tags']:
-                if tag not in tag_first_index:
-                    tag_first_index[tag] = index
-    
-    # Filter to only include release tags (starting with 'v' or 'V' or SemVer format: MAJOR.MINOR.PATCH)
-    release_tags = [tag for tag in tag_first_index.keys() if is_semver_tag(tag)]
-    
-    if not release_tags:
-        return []
-    
-    # Get unique commit indices where release tags appear (in order)
-    unique_indices = sorted(set(tag_first_index[tag] for tag in release_tags))
-    
-    # For each unique index, collect all release tags that appear at that index
-    tag_groups = []
-    for index in unique_indices:
-        tags_at_index = [tag for tag in release_tags if tag_first_index[tag] == index]
-        tag_groups.append({'index': index, 'tags': tags_at_index})
-    
-    releases_list = []
-    
-    # Check for commits before the first tag (Incoming commits)
-    if tag_groups and tag_groups[0]['index'] > 0:
-        incoming_commits = commits[:tag_groups[0]['index']]
-        releases_list.append({
-            'tag': 'Incoming',
-            'commits': incoming_commits,
-            'start_date': timestamp_to_date(incoming_commits[0]['timestamp']) if incoming_commits else '',
-            'end_date': timestamp_to_date(incoming_commits[-1]['timestamp']) if incoming_commits else '',
-            'commit_count': len(incoming_commits),
-            'is_virtual': True
-        })
-    
-    # Process each release
-    for i, current_group in enumerate(tag_groups):
-        next_group = tag_groups[i + 1] if i < len(tag_groups) - 1 else None
-        
-        start_index = current_group['index']
-        end_index = next_group['index'] if next_group else len(commits)
+        author_key = (commit['author'], commit.get('email', ''))
+        if author_key not in author_index:
+            author_index[author_key] = len(authors)
+            author_name_index.setdefault(author_key[0], len(authors))
+            authors.append(list(author_key))
+        commit_type = commit.get('type', 'other')
+        if commit_type not in type_index:
+            type_index[commit_type] = len(types)
+            types.append(commit_type)
         
-        release_commits = commits[start_index:end_index]
-        releases_list.append({
-            'tag': ' / '.join(current_group['tags']),  # Merge multiple tags on same commit
-            'commits': release_commits,
-            'start_date': timestamp_to_date(release_commits[0]['timestamp']) if release_commits else '',
-            'end_date': timestamp_to_date(release_commits[-1]['timestamp']) if release_commits else '',
-            'commit_count': len(release_commits),
-            'is_virtual': False
-        })
+        columns['hash'].append(commit['hash'])
+        columns['author'].append(author_index[author_key])
+        columns['timestamp'].append(commit['timestamp'])
+        columns['message'].append(commit['message'])
+        columns['type'].append(type_index[commit_type])
+        columns['files_changed'].append(commit['files_changed'])
+        columns['insertions'].append(commit['insertions'])
+        columns['deletions'].append(commit['deletions'])
+        if commit.get('tags'):
+            tags[str(index)] = commit['tags']
+        if commit.get('trailers'):
+            trailers[str(index)] = commit['trailers']
+        if commit.get('merged_commits'):
+            merged_commits[str(index)] = commit['merged_commits']
+    
+    for index, merged in merged_commits.items():
+        compact = []
+        for merged_commit in merged:
+            author = merged_commit['author']
+            if author not in author_name_index:
+                author_name_index[author] = len(authors)
+                authors.append([author, ''])
+            compact.append({
+                'hash': merged_commit['hash'],
+                'author': author_name_index[author],
+                'timestamp': merged_commit['timestamp'],
+                'message_short': merged_commit['message_short'],
+                'type': merged_commit['type']
+            })
+        merged_commits[index] = compact
+    
+    if tags:
+        columns['tags'] = tags
+    if trailers:
+        columns['trailers'] = trailers
+    if merged_commits:
+        columns['merged_commits'] = merged_commits
+    
+    columnar = {key: value for key, value in release_data.items() if key not in ('commits', 'release_ranges')}
+    columnar.update({
+        'format': 'columnar',
+        'format_version': 1,
+        'authors': authors,
+        'types': types,
+        'commits': columns,
+        'releases': release_ranges(commits)
+    })
+    return columnar
+
+
+def from_columnar_release_data(data):
+    """
+    Expand columnar release data back to the default format.
     
-    # Sort by date (most recent first)
-    releases_list.sort(key=lambda r: r['start_date'] if r['start_date'] else '', reverse=True)
+    The release index ranges are kept under 'release_ranges' (see
+    get_release_data_releases).
     
-    return releases_list
+    Args:
+        data: Release data dictionary, columnar or default
+    
+    Returns:
+        Release data dictionary in the default format (returned unchanged
+        if it is not columnar)
+    """
+    if data.get('format') != 'columnar':
+        return data
+    
+    columns = data['commits']
+    tags = columns.get('tags', {})
+    trailers = columns.get('trailers', {})
+    merged_commits = columns.get('merged_commits', {})
+    commits = []
+    for index, commit_hash in enumerate(columns['hash']):
+        author, email = data['authors'][columns['author'][index]]
+        message = columns['message'][index]
+        commit = {
+            'hash': commit_hash,
+            'short_hash': commit_hash[:7],
+            'author': author,
+            'email': email,
+            'timestamp': columns['timestamp'][index],
+            'message': message,
+            'message_short': message.split('\n')[0][:100],
+            'type': data['types'][columns['type'][index]],
+            'files_changed': columns['files_changed'][index],
+            'insertions': columns['insertions'][index],
+            'deletions': columns['deletions'][index]
+        }
+        if str(index) in tags:
+            commit['tags'] = tags[str(index)]
+        if str(index) in trailers:
+            commit['trailers'] = trailers[str(index)]
+        if str(index) in merged_commits:
+            commit['merged_commits'] = [
+                {
+                    'hash': merged['hash'],
+                    'short_hash': merged['hash'][:7],
+                    'author': data['authors'][merged['author']][0],
+                    'timestamp': merged['timestamp'],
+                    'message_short': merged['message_short'],
+                    'type': merged['type']
+                }
+                for merged in merged_commits[str(index)]
+            ]
+        commits.append(commit)
+    
+    skipped = ('format', 'format_version', 'authors', 'types', 'commits', 'releases')
+    release_data = {key: value for key, value in data.items() if key not in skipped}
+    release_data['commits'] = commits
+    if 'releases' in data:
+        release_data['release_ranges'] = data['releases']
+    return release_data
 
 
 def get_type_emoji(commit_type):
@@ -486,27 +2128,33 @@ def get_type_emoji(commit_type):
     return type_emojis.get(commit_type, '📌')
 
 
-def generate_single_release_timeline(release):
+# Bucketed timelines (see _timeline_date_lines): at most this many day/week buckets,
+# each listing its largest commits
+TIMELINE_MAX_BUCKETS = 30
+TIMELINE_TOP_MESSAGES = 3
+
+
+def _timeline_date_lines(commits, max_commits=None):
     """
-    Generate timeline visualization for a single release.
+    Build the date tree of a timeline block (latest date first).
+    
+    Commits are listed one per line (oldest first within each date). When a
+    release has more than max_commits commits, they are grouped into day
+    buckets instead, or ISO week buckets when the release spans more than
+    TIMELINE_MAX_BUCKETS days. Each bucket shows its commit count per type and
+    its TIMELINE_TOP_MESSAGES largest commits; buckets beyond
+    TIMELINE_MAX_BUCKETS are folded into one line, so the output stays
+    bounded whatever the number of commits.
     
     Args:
-        release: Release dictionary
+        commits: List of commit dictionaries
+        max_commits: Commit count above which commits are bucketed (None: never)
     
     Returns:
-        String containing the timeline markdown
+        List of timeline lines
     """
-    lines = ['```']
-    
-    # Release header with date/time
-    release_emoji = '🚀' if release['is_virtual'] else '🏷️'
-    lines.append(f"{release_emoji} {release['tag']} ━━━━━━━━━━━━━━━━━━━━")
-    # Format date without seconds (HH:MM only)
-    release_date_short = release['start_date'].rsplit(':', 1)[0] if ':' in release['start_date'] else release['start_date']
-    lines.append(f"│ 📅 {release_date_short}")
-    
     # Sort commits by timestamp (oldest first within this release)
-    sorted_commits = sorted(release['commits'], key=lambda c: c['timestamp'])
+    sorted_commits = sorted(commits, key=lambda c: c['timestamp'])
     
     # Group commits by date
     commits_by_date = {}
@@ -516,57 +2164,124 @@ def generate_single_release_timeline(release):
             commits_by_date[commit_date] = []
         commits_by_date[commit_date].append(commit)
     
-    # Sort dates chronologically (convert to datetime for proper sorting) - latest first
-    from datetime import datetime as dt
-    sorted_dates = sorted(commits_by_date.keys(), key=lambda d: dt.strptime(d, '%Y-%m-%d'), reverse=True)
+    bucketed = max_commits is not None and len(commits) > max_commits
+    if bucketed and len(commits_by_date) > TIMELINE_MAX_BUCKETS:
+        # Group by ISO week, labelled by its Monday
+        commits_by_week = {}
+        for commit_date, day_commits in commits_by_date.items():
+            day = datetime.strptime(commit_date, '%Y-%m-%d')
+            week = f"week of {(day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')}"
+            commits_by_week.setdefault(week, []).extend(day_commits)
+        buckets, unit = commits_by_week, 'weeks'
+    else:
+        buckets, unit = commits_by_date, 'days'
+    
+    # Dates (and week labels) sort chronologically as strings - latest first
+    sorted_dates = sorted(buckets, reverse=True)
+    folded = []
+    if bucketed and len(sorted_dates) > TIMELINE_MAX_BUCKETS:
+        sorted_dates, folded = sorted_dates[:TIMELINE_MAX_BUCKETS - 1], sorted_dates[TIMELINE_MAX_BUCKETS - 1:]
     
+    lines = []
     # Iterate through dates in order
     for date_idx, commit_date in enumerate(sorted_dates):
-        commits_on_date = commits_by_date[commit_date]
-        is_last_date = (date_idx == len(sorted_dates) - 1)
+        commits_on_date = buckets[commit_date]
+        is_last_date = (date_idx == len(sorted_dates) - 1) and not folded
         
         # Date header
         date_connector = '└─' if is_last_date else '├─'
+        branch = '│     ' if is_last_date else '│ │   '
+        
+        if bucketed:
+            type_counts = {}
+            for commit in commits_on_date:
+                commit_type = commit.get('type', 'other')
+                type_counts[commit_type] = type_counts.get(commit_type, 0) + 1
+            counts = ' '.join(
+                f"{get_type_emoji(commit_type)} {type_counts[commit_type]}"
+                for commit_type in sorted(type_counts, key=lambda t: COMMIT_TYPES.index(t) if t in COMMIT_TYPES else len(COMMIT_TYPES))
+            )
+            lines.append(f"│ {date_connector} 📆 {commit_date} · {len(commits_on_date)} commits · {counts}")
+            
+            # Largest commits of the bucket, then how many are not shown
+            top_commits = sorted(commits_on_date, key=lambda c: c['insertions'] + c['deletions'], reverse=True)
+            top_commits = top_commits[:TIMELINE_TOP_MESSAGES]
+            hidden = len(commits_on_date) - len(top_commits)
+            for commit_idx, commit in enumerate(top_commits):
+                connector = '└─' if commit_idx == len(top_commits) - 1 and not hidden else '├─'
+                emoji = get_type_emoji(commit.get('type', 'other'))
+                lines.append(f"{branch}{connector} {emoji} {commit['message_short'][:60].strip()}")
+            if hidden:
+                lines.append(f"{branch}└─ … {hidden} more")
+            continue
+        
         lines.append(f"│ {date_connector} 📆 {commit_date}")
         
         # Commits for this date
         for commit_idx, commit in enumerate(commits_on_date):
             is_last_commit = (commit_idx == len(commits_on_date) - 1)
-            
+            connector = '└─' if is_last_commit else '├─'
             emoji = get_type_emoji(commit.get('type', 'other'))
-            
-            if is_last_date:
-                # For last date, use spaces for vertical alignment
-                if is_last_commit:
-                    commit_line = f"│     └─ {emoji} {commit['message_short'][:60].strip()}"
-                else:
-                    commit_line = f"│     ├─ {emoji} {commit['message_short'][:60].strip()}"
-            else:
-                # For non-last dates, use pipe for continuation
-                if is_last_commit:
-                    commit_line = f"│ │   └─ {emoji} {commit['message_short'][:60].strip()}"
-                else:
-                    commit_line = f"│ │   ├─ {emoji} {commit['message_short'][:60].strip()}"
-            
-            lines.append(commit_line)
+            # For last date, use spaces for vertical alignment, otherwise a pipe for continuation
+            lines.append(f"{branch}{connector} {emoji} {commit['message_short'][:60].strip()}")
+    
+    if folded:
+        folded_count = sum(len(buckets[label]) for label in folded)
+        lines.append(f"│ └─ 📆 … {len(folded)} earlier {unit} · {folded_count} commits")
+    
+    return lines
+
+
+def _net_stats_suffix(release):
+    """Return the ' · net ...' suffix for a release's summed stats line ('' without net stats)."""
+    net = release.get('net_stats')
+    if not net:
+        return ''
+    return f" · net +{net['insertions']} / -{net['deletions']} / {net['files_changed']} files"
+
+
+def generate_single_release_timeline(release, max_commits=None):
+    """
+    Generate timeline visualization for a single release.
+    
+    Args:
+        release: Release dictionary
+        max_commits: Bucket commits by day/week above this many commits
+            (see _timeline_date_lines, None lists every commit)
+    
+    Returns:
+        String containing the timeline markdown
+    """
+    lines = ['```']
+    
+    # Release header with date/time
+    release_emoji = '🚀' if release['is_virtual'] else '🏷️'
+    lines.append(f"{release_emoji} {release['tag']} ━━━━━━━━━━━━━━━━━━━━")
+    # Format date without seconds (HH:MM only)
+    release_date_short = release['start_date'].rsplit(':', 1)[0] if ':' in release['start_date'] else release['start_date']
+    lines.append(f"│ 📅 {release_date_short}")
+    
+    lines.extend(_timeline_date_lines(release['commits'], max_commits))
     
     # Stats
     total_insertions = sum(c['insertions'] for c in release['commits'])
     total_deletions = sum(c['deletions'] for c in release['commits'])
     total_files = sum(c['files_changed'] for c in release['commits'])
     
-    lines.append(f"└─ 📊 +{total_insertions} / -{total_deletions} / {total_files} files")
+    lines.append(f"└─ 📊 +{total_insertions} / -{total_deletions} / {total_files} files{_net_stats_suffix(release)}")
     lines.append('```')
     
     return '\n'.join(lines)
 
 
-def generate_vertical_timeline_by_release(releases):
+def generate_vertical_timeline_by_release(releases, max_commits=None):
     """
     Generate vertical timeline visualization by releases.
     
     Args:
         releases: List of release dictionaries
+        max_commits: Bucket a release's commits by day/week above this many
+            commits (see _timeline_date_lines, None lists every commit)
     
     Returns:
         String containing the timeline markdown
@@ -586,57 +2301,14 @@ def generate_vertical_timeline_by_release(releases):
         release_date_short = release['start_date'].rsplit(':', 1)[0] if ':' in release['start_date'] else release['start_date']
         lines.append(f"│ 📅 {release_date_short}")
         
-        # Sort commits by timestamp (oldest first within this release)
-        sorted_commits = sorted(release['commits'], key=lambda c: c['timestamp'])
-        
-        # Group commits by date
-        commits_by_date = {}
-        for commit in sorted_commits:
-            commit_date = timestamp_to_date(commit['timestamp']).split()[0]  # Get just the date part
-            if commit_date not in commits_by_date:
-                commits_by_date[commit_date] = []
-            commits_by_date[commit_date].append(commit)
-        
-        # Sort dates chronologically (convert to datetime for proper sorting) - latest first
-        from datetime import datetime as dt
-        sorted_dates = sorted(commits_by_date.keys(), key=lambda d: dt.strptime(d, '%Y-%m-%d'), reverse=True)
-        
-        # Iterate through dates in order
-        for date_idx, commit_date in enumerate(sorted_dates):
-            commits_on_date = commits_by_date[commit_date]
-            is_last_date = (date_idx == len(sorted_dates) - 1)
-            
-            # Date header
-            date_connector = '└─' if is_last_date else '├─'
-            lines.append(f"│ {date_connector} 📆 {commit_date}")
-            
-            # Commits for this date
-            for commit_idx, commit in enumerate(commits_on_date):
-                is_last_commit = (commit_idx == len(commits_on_date) - 1)
-                
-                emoji = get_type_emoji(commit.get('type', 'other'))
-                
-                if is_last_date:
-                    # For last date, use spaces for vertical alignment
-                    if is_last_commit:
-                        commit_line = f"│     └─ {emoji} {commit['message_short'][:60].strip()}"
-                    else:
-                        commit_line = f"│     ├─ {emoji} {commit['message_short'][:60].strip()}"
-                else:
-                    # For non-last dates, use pipe for continuation
-                    if is_last_commit:
-                        commit_line = f"│ │   └─ {emoji} {commit['message_short'][:60].strip()}"
-                    else:
-                        commit_line = f"│ │   ├─ {emoji} {commit['message_short'][:60].strip()}"
-                
-                lines.append(commit_line)
+        lines.extend(_timeline_date_lines(release['commits'], max_commits))
         
         # Stats
         total_insertions = sum(c['insertions'] for c in release['commits'])
         total_deletions = sum(c['deletions'] for c in release['commits'])
         total_files = sum(c['files_changed'] for c in release['commits'])
         
-        lines.append(f"└─ 📊 +{total_insertions} / -{total_deletions} / {total_files} files")
+        lines.append(f"└─ 📊 +{total_insertions} / -{total_deletions} / {total_files} files{_net_stats_suffix(release)}")
         
         if not is_last:
             lines.append('')
@@ -645,7 +2317,7 @@ def generate_vertical_timeline_by_release(releases):
     return '\n'.join(lines)
 
 
-def generate_markdown_by_release(releases, release_data, include_timeline=False):
+def generate_markdown_by_release(releases, release_data, include_timeline=False, timeline_max_commits=None):
     """
     Generate markdown structured by releases.
     
@@ -653,6 +2325,7 @@ def generate_markdown_by_release(releases, release_data, include_timeline=False)
         releases: List of release dictionaries
         release_data: Full release data
         include_timeline: Include timeline visualization
+        timeline_max_commits: Bucket timeline commits by day/week above this many per release
     
     Returns:
         List of markdown lines
@@ -682,13 +2355,23 @@ def generate_markdown_by_release(releases, release_data, include_timeline=False)
         
         # Add timeline for this release if requested
         if include_timeline:
-            timeline = generate_single_release_timeline(release)
+            timeline = generate_single_release_timeline(release, timeline_max_commits)
             md_lines.append(timeline)
             md_lines.append("")
         
         md_lines.append(f"**Commits:** {release['commit_count']} | **Period:** {release['start_date']} to {release['end_date']}")
         md_lines.append("")
         
+        # Net release diff next to the per-commit sums
+        if release.get('net_stats'):
+            net = release['net_stats']
+            summed_files = sum(c['files_changed'] for c in release['commits'])
+            summed_insertions = sum(c['insertions'] for c in release['commits'])
+            summed_deletions = sum(c['deletions'] for c in release['commits'])
+            md_lines.append(f"**Net changes:** {net['files_changed']} files, +{net['insertions']}/-{net['deletions']} lines "
+                            f"(summed over commits: {summed_files} files, +{summed_insertions}/-{summed_deletions} lines)")
+            md_lines.append("")
+        
         # Group commits by type
         commits_by_type = {
             'feat': [],
@@ -741,6 +2424,7 @@ def generate_markdown_by_release(releases, release_data, include_timeline=False)
                 
                 md_lines.append(f"- {first_line} ({commit_link}) - *{commit['author']}* - {timestamp_to_date(commit['timestamp'])}")
                 md_lines.append(f"  - 📊 {commit['files_changed']} files, +{commit['insertions']}/-{commit['deletions']} lines")
+                md_lines.extend(generate_merged_commits_markdown(commit, repo_url))
                 md_lines.append("")
             
             md_lines.append("")
@@ -768,13 +2452,14 @@ def generate_markdown_by_release(releases, release_data, include_timeline=False)
     return md_lines
 
 
-def generate_markdown_by_type(release_data, include_timeline=False):
+def generate_markdown_by_type(release_data, include_timeline=False, timeline_max_commits=None):
     """
     Generate markdown structured by commit date (chronological order).
     
     Args:
         release_data: Full release data
         include_timeline: Include timeline visualization
+        timeline_max_commits: Bucket timeline commits by day/week above this many
     
     Returns:
         List of markdown lines
@@ -793,7 +2478,7 @@ def generate_markdown_by_type(release_data, include_timeline=False):
             'is_virtual': True
         }
         
-        timeline = generate_single_release_timeline(all_commits_release)
+        timeline = generate_single_release_timeline(all_commits_release, timeline_max_commits)
         md_lines.append("## 📈 Timeline")
         md_lines.append("")
         md_lines.append(timeline)
@@ -842,6 +2527,7 @@ def generate_markdown_by_type(release_data, include_timeline=False):
         
         # Add stats
         md_lines.append(f"  - 📊 {commit['files_changed']} files, +{commit['insertions']}/-{commit['deletions']} lines")
+        md_lines.extend(generate_merged_commits_markdown(commit, repo_url))
         md_lines.append("")
     
     # Summary statistics
@@ -894,6 +2580,310 @@ def generate_markdown_by_type(release_data, include_timeline=False):
     return md_lines
 
 
+# Same palette as the web viewer timeline (release_notes.css)
+TYPE_COLORS = {
+    'feat': '#2da44e',
+    'fix': '#cf222e',
+    'docs': '#0969da',
+    'style': '#8e24aa',
+    'refactor': '#00acc1',
+    'test': '#7cb342',
+    'perf': '#fbc02d',
+    'ops': '#546e7a',
+    'chore': '#fb8500',
+    'other': '#656d76'
+}
+
+CHARTS_MANIFEST = 'charts.json'
+
+
+def render_charts(release_data, output_dir):
+    """
+    Pre-render calendar, timeline and sparkline charts as SVG files.
+    
+    Commit data is turned into numpy arrays once and all per-day / per-type
+    counts are computed with vectorized operations. Each chart is cached by a
+    hash of its input data (stored in charts.json in output_dir), so charts
+    whose data did not change are not rendered again.
+    
+    Requires matplotlib and numpy.
+    
+    Args:
+        release_data: Release data dictionary
+        output_dir: Directory to write the SVG files to
+    
+    Returns:
+        Tuple (files, rendered) where files maps chart name to SVG path and
+        rendered lists the charts that were (re)generated
+    """
+    try:
+        import numpy as np
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError as e:
+        raise RuntimeError('Chart rendering requires matplotlib and numpy (pip install matplotlib numpy)') from e
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / CHARTS_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        manifest = {}
+    
+    commits = from_columnar_release_data(release_data)['commits']
+    type_index = {commit_type: i for i, commit_type in enumerate(COMMIT_TYPES)}
+    timestamps = np.array([c['timestamp'] for c in commits], dtype=np.int64)
+    types = np.array([type_index.get(c.get('type', 'other'), type_index['other']) for c in commits], dtype=np.int64)
+    tagged = np.array([bool(c.get('tags')) for c in commits], dtype=bool)
+    
+    # Per-day (UTC, like the web viewer) and per-type counts
+    if len(timestamps):
+        days = timestamps // 86400
+        first_day = int(days.min())
+        day_offsets = days - first_day
+        num_days = int(day_offsets.max()) + 1
+    else:
+        first_day, day_offsets, num_days = 0, np.zeros(0, dtype=np.int64), 0
+    daily_counts = np.bincount(day_offsets, minlength=num_days)
+    
+    plt.rcParams['svg.hashsalt'] = 'release-notes'
+    
+    def save(fig, name):
+        fig.savefig(output_dir / f'{name}.svg', format='svg', transparent=True, metadata={'Date': None})
+        plt.close(fig)
+    
+    def draw_calendar():
+        # GitHub-style grid: one column per week (Monday first), one row per weekday
+        weekday_offset = (first_day + 3) % 7  # 1970-01-01 was a Thursday
+        cells = np.arange(num_days) + weekday_offset
+        grid = np.full(((num_days + weekday_offset + 6) // 7) * 7, np.nan)
+        grid[cells] = daily_counts
+        grid = grid.reshape(-1, 7).T
+        grid = np.where(grid == 0, np.nan, grid)
+        fig, ax = plt.subplots(figsize=(max(grid.shape[1] * 0.22, 2) + 0.8, 2))
+        ax.imshow(grid, cmap='Greens', aspect='equal', vmin=0, vmax=max(int(daily_counts.max(initial=0)), 1))
+        ax.set_yticks(range(7), ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'], fontsize=7)
+        ax.set_xticks([])
+        ax.spines[:].set_visible(False)
+        fig.tight_layout()
+        save(fig, 'calendar')
+    
+    def draw_timeline():
+        fig, ax = plt.subplots(figsize=(10, 1.6))
+        dates = timestamps.astype('datetime64[s]')
+        colors = [TYPE_COLORS[COMMIT_TYPES[i]] for i in types]
+        ax.scatter(dates, np.zeros(len(dates)), c=colors, s=30, zorder=3)
+        if tagged.any():
+            ax.vlines(dates[tagged], -0.5, 0.5, colors='#999999', linestyles='dashed', zorder=2)
+        ax.axhline(0, color='#d0d7de', zorder=1)
+        ax.set_yticks([])
+        ax.spines[['top', 'right', 'left']].set_visible(False)
+        fig.autofmt_xdate()
+        fig.tight_layout()
+        save(fig, 'timeline')
+    
+    def draw_sparkline():
+        fig, ax = plt.subplots(figsize=(1.2, 0.36))
+        x = np.arange(len(daily_counts))
+        ax.fill_between(x, daily_counts, color=TYPE_COLORS['docs'], alpha=0.25, linewidth=0)
+        ax.plot(x, daily_counts, color=TYPE_COLORS['docs'], linewidth=1)
+        ax.set_axis_off()
+        ax.margins(0)
+        fig.subplots_adjust(0, 0, 1, 1)
+        save(fig, 'sparkline')
+    
+    charts = {
+        'calendar': (draw_calendar, {'first_day': first_day, 'daily_counts': daily_counts.tolist()}),
+        'timeline': (draw_timeline, {
+            'timestamps': timestamps.tolist(),
+            'types': types.tolist(),
+            'tagged': tagged.tolist()
+        }),
+        'sparkline': (draw_sparkline, {'daily_counts': daily_counts.tolist()})
+    }
+    
+    files = {}
+    rendered = []
+    for name, (draw, chart_input) in charts.items():
+        chart_path = output_dir / f'{name}.svg'
+        input_hash = hashlib.sha256(json.dumps(chart_input, sort_keys=True).encode('utf-8')).hexdigest()
+        if manifest.get(name) != input_hash or not chart_path.exists():
+            draw()
+            manifest[name] = input_hash
+            rendered.append(name)
+        files[name] = chart_path
+    
+    manifest = {name: manifest[name] for name in charts}
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return files, rendered
+
+
+# Type labels of the web viewer (TYPE_LABELS in release_notes.js)
+VIEWER_TYPE_LABELS = {
+    'feat': ('Features', '✨'),
+    'fix': ('Bug Fixes', '🐛'),
+    'docs': ('Documentation', '📚'),
+    'style': ('Code Style', '💎'),
+    'refactor': ('Code Refactoring', '♻️'),
+    'test': ('Tests', '✅'),
+    'perf': ('Performance', '⚡'),
+    'ops': ('CI/CD & Build', '🚀'),
+    'chore': ('Chores', '🔧'),
+    'other': ('Other Changes', '📌')
+}
+
+
+def render_commit_html(commit, repo_url):
+    """
+    Render a commit as the web viewer's commit list item (createCommitHTML in release_notes.js).
+    
+    Args:
+        commit: Commit dictionary
+        repo_url: Repository URL used for commit links ('' for none)
+    
+    Returns:
+        Escaped HTML string
+    """
+    def esc(value):
+        return html.escape(str(value))
+    
+    commit_url = f"{repo_url}/commit/{commit['hash']}" if repo_url else '#'
+    summary_text = commit.get('message_short') or (commit['message'].split('\n')[0] or '')
+    body_id = f"commit-{commit['hash']}"
+    commit_class = 'commit-item commit-renovate' if re.search('renovate', commit.get('author') or '', re.IGNORECASE) else 'commit-item'
+    tag_class = ' has-tag' if commit.get('tags') else ''
+    type_key = (commit.get('type') or 'other').lower()
+    type_label = VIEWER_TYPE_LABELS.get(type_key, (type_key,))[0]
+    day_key = datetime.fromtimestamp(commit['timestamp'], timezone.utc).strftime('%Y-%m-%d')
+    
+    tag_badges = ''.join(
+        f'<span class="commit-tag" title="Git Tag: {esc(tag)}">{esc(tag)}</span>'
+        for tag in commit.get('tags', [])
+    )
+    
+    # Commits folded under a merge (exported with --first_parent --nest_merged)
+    merged_html = ''
+    if commit.get('merged_commits'):
+        items = []
+        for merged in commit['merged_commits']:
+            merged_type = (merged.get('type') or 'other').lower()
+            merged_url = f"{repo_url}/commit/{merged['hash']}" if repo_url else '#'
+            items.append(
+                f'<li class="merged-commit-item"><a href="{esc(merged_url)}" target="_blank" class="commit-hash" '
+                f'title="{merged["hash"]}">{merged["short_hash"]}</a> <span class="commit-type type-{esc(merged_type)}">'
+                f'{esc(VIEWER_TYPE_LABELS.get(merged_type, (merged_type,))[0])}</span> {esc(merged["message_short"])} '
+                f'<span class="commit-author">by {esc(merged["author"])}</span></li>'
+            )
+        merged_html = f'<ul class="merged-commit-list">{"".join(items)}</ul>'
+    
+    return (
+        f'<li class="{commit_class}{tag_class}" data-target="{body_id}" data-commit-type="{esc(type_key)}" '
+        f'data-commit-hash="{commit["hash"]}" data-commit-day="{day_key}">'
+        f'<div class="commit-header"><div class="commit-header-left">'
+        f'<a href="{esc(commit_url)}" target="_blank" class="commit-hash" title="{commit["hash"]}">{commit["short_hash"]}</a>'
+        f'<span class="commit-type type-{esc(type_key)}" title="{esc(type_label)}">{esc(type_label)}</span>{tag_badges}</div>'
+        f'<span class="commit-date">{timestamp_to_date(commit["timestamp"])}</span></div>'
+        f'<div class="commit-summary">{esc(summary_text)}</div>'
+        f'<div class="commit-body collapsed" id="{body_id}">'
+        f'<div class="commit-message">{esc(commit["message"])}</div>{merged_html}'
+        f'<div class="commit-footer"><span class="commit-author">by {esc(commit["author"])}</span>'
+        f'<div class="commit-stats"><span class="stat additions" title="Insertions">+{commit["insertions"]}</span>'
+        f'<span class="stat deletions" title="Deletions">-{commit["deletions"]}</span>'
+        f'<span class="stat" title="Files changed">📄 {commit["files_changed"]}</span></div></div></div></li>'
+    )
+
+
+def render_release_html(release, repo_url):
+    """
+    Render a release as the web viewer's release section (displayReleaseView in release_notes.js).
+    
+    Args:
+        release: Release dictionary (see parse_releases)
+        repo_url: Repository URL used for commit links ('' for none)
+    
+    Returns:
+        Escaped HTML string
+    """
+    type_counts = {commit_type: 0 for commit_type in VIEWER_TYPE_LABELS}
+    for commit in release['commits']:
+        commit_type = (commit.get('type') or 'other').lower()
+        type_counts[commit_type if commit_type in type_counts else 'other'] += 1
+    category_summary = ''.join(
+        f'<span class="release-category-badge {commit_type}">{VIEWER_TYPE_LABELS[commit_type][1]} '
+        f'{VIEWER_TYPE_LABELS[commit_type][0]}: {count}</span>'
+        for commit_type, count in type_counts.items() if count
+    )
+    commit_list = ''.join(render_commit_html(commit, repo_url) for commit in release['commits'])
+    tag = html.escape(release['tag'])
+    
+    return (
+        f'<div class="release-section {"virtual-release" if release["is_virtual"] else ""}" data-release-tag="{tag}">'
+        f'<div class="release-header"><h2 class="release-title">{"🚀" if release["is_virtual"] else "🏷️"} {tag}</h2>'
+        f'<div class="release-meta"><span class="release-commit-count">📊 {release["commit_count"]} commits</span>'
+        f'<span class="release-date-range">📅 {release["start_date"]} to {release["end_date"]}</span></div></div>'
+        f'<div class="release-summary">{category_summary}</div>'
+        f'<ul class="commit-list">{commit_list}</ul></div>\n'
+    )
+
+
+FRAGMENTS_MANIFEST = 'fragments.json'
+
+
+def write_release_fragments(release_data, output_dir):
+    """
+    Write one pre-rendered HTML fragment per release for the web viewer.
+    
+    Releases are the ones of the markdown "by release" output (parse_releases);
+    the viewer inserts a fragment with a single innerHTML assignment instead of
+    building and escaping every commit client-side.
+    
+    The fragments written are listed in fragments.json in output_dir; those
+    of the previous run that are not rewritten are removed, so releases that
+    left the window do not linger. Other files in output_dir are never
+    touched. File names are the sanitised tag plus
+    a short hash of the exact tag, so tags that sanitise alike (release/1.0
+    and release-1.0) get distinct files.
+    
+    Args:
+        release_data: Release data dictionary
+        output_dir: Directory to write the .html fragments to
+    
+    Returns:
+        Dictionary mapping release tag to fragment path (empty without releases)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / FRAGMENTS_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        manifest = {}
+    repo_url = release_data['repository']['url']
+    
+    files = {}
+    for release in get_release_data_releases(release_data):
+        name = re.sub(r'[^A-Za-z0-9._-]+', '_', release['tag'])
+        tag_hash = hashlib.sha1(release['tag'].encode('utf-8')).hexdigest()[:8]
+        path = output_dir / f'release-{name}-{tag_hash}.html'
+        path.write_text(render_release_html(release, repo_url), encoding='utf-8')
+        files[release['tag']] = path
+    
+    # Remove the previous run's fragments that were not rewritten (fragment file names only)
+    written = {path.name for path in files.values()}
+    for stale in manifest.values() if isinstance(manifest, dict) else ():
+        if (isinstance(stale, str) and stale == Path(stale).name and stale.startswith('release-')
+                and stale.endswith('.html') and stale not in written):
+            try:
+                (output_dir / stale).unlink()
+            except FileNotFoundError:
+                pass
+    manifest = {tag: path.name for tag, path in files.items()}
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return files
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Export commit messages from current repository for release notes',
@@ -950,6 +2940,14 @@ def main():
         help='Include timeline visualization in markdown output (default: False)'
     )
 
+    parser.add_argument(
+        '--md_timeline_max_commits',
+        type=int,
+        default=None,
+        help='With --md_timeline, group a release\'s commits into per-day (or per-week) buckets with counts per type '
+             'and the largest commits when it has more than this many commits (default: list every commit)'
+    )
+
     parser.add_argument(
         '--exclude_title',
         action='append',
@@ -970,9 +2968,136 @@ def main():
         default=[],
         help='Regex pattern to exclude commits by full message content (repeatable)'
     )
+
+    parser.add_argument(
+        '--exclude_trailer',
+        action='append',
+        default=[],
+        metavar='KEY[=REGEX]',
+        help='Exclude commits with a KEY trailer (e.g. Release-Note) whose value matches REGEX, '
+             'or with that trailer at all when no REGEX is given (repeatable)'
+    )
+
+    parser.add_argument(
+        '--fill_after_exclude',
+        action='store_true',
+        help='Keep walking history until --num_commits commits pass the exclude patterns '
+             '(author/message patterns are evaluated by git during the walk where possible)'
+    )
+
+    parser.add_argument(
+        '--first_parent',
+        action='store_true',
+        help='Only walk mainline commits (first parent of merges); merge stats are computed against the first parent'
+    )
+
+    parser.add_argument(
+        '--nest_merged',
+        action='store_true',
+        help='With --first_parent, list the commits brought in by each merge under that merge commit'
+    )
+
+    parser.add_argument(
+        '--deepen_shallow',
+        action='store_true',
+        help='In a shallow clone, fetch more history from origin only as far as needed to cover '
+             '--num_commits and reach the commits of the remote release tags (up to --deepen_max_depth)'
+    )
+
+    parser.add_argument(
+        '--deepen_max_depth',
+        type=int,
+        default=DEEPEN_MAX_DEPTH,
+        help=f'With --deepen_shallow, stop deepening for release tags once the branch has this many commits '
+             f'(default: {DEEPEN_MAX_DEPTH})'
+    )
+
+    parser.add_argument(
+        '--net_release_stats',
+        action='store_true',
+        help='Compute net files/insertions/deletions per release with one git diff --shortstat per release '
+             '(run in parallel) and report them next to the per-commit sums'
+    )
+
+    parser.add_argument(
+        '--json_format',
+        choices=['default', 'columnar'],
+        default='default',
+        help='JSON output format: default (one object per commit) or columnar '
+             '(compact per-field arrays with deduplicated authors, default: default)'
+    )
+
+    parser.add_argument(
+        '--charts',
+        type=str,
+        nargs='?',
+        const='charts',
+        default=None,
+        help='Pre-render calendar, timeline and sparkline SVG charts into this directory '
+             '(default when given without a value: charts). Requires matplotlib and numpy'
+    )
+
+    parser.add_argument(
+        '--html_fragments',
+        type=str,
+        nargs='?',
+        const='fragments',
+        default=None,
+        help='Pre-render one escaped HTML fragment per release into this directory for the web viewer '
+             '(default when given without a value: fragments)'
+    )
+
+    parser.add_argument(
+        '--engine',
+        choices=list(EXTRACTION_ENGINES),
+        default='gitpython',
+        help='Commit extraction engine: gitpython (per-commit stats) or log (one streamed git log '
+             'call with batched stats) (default: gitpython)'
+    )
+
+    parser.add_argument(
+        '--write_commit_graph',
+        action='store_true',
+        help="Write git's commit-graph file (git commit-graph write --reachable) if the repository has none. "
+             'An existing commit-graph is always used to speed up release tag ancestry checks'
+    )
+
+    parser.add_argument(
+        '--tag_cache',
+        type=str,
+        nargs='?',
+        const='',
+        default=None,
+        help='Persist release tag attachments and patch-ids between runs in this JSON file '
+             '(default when given without a value: release_notes_tag_cache.json in the git directory)'
+    )
+
+    parser.add_argument(
+        '--delta',
+        type=str,
+        nargs='?',
+        const='',
+        default=None,
+        help='Also write the commits added, releases newly tagged and commits moved from Incoming into a release '
+             'since the previous export to this JSON file (default when given without a value: '
+             '<output>.delta.json next to --output)'
+    )
+
+    parser.add_argument(
+        '--delta_previous',
+        type=str,
+        default=None,
+        help='Previous export (default or columnar JSON) to compare with for --delta (default: the existing --output file)'
+    )
     
     args = parser.parse_args()
-    
+
+    if args.nest_merged and not args.first_parent:
+        parser.error('--nest_merged requires --first_parent')
+
+    if args.delta_previous and args.delta is None:
+        parser.error('--delta_previous requires --delta')
+
     # Export release notes
     export_release_notes(
         args.repo_path,
@@ -982,9 +3107,25 @@ def main():
         args.markdown,
         latest_release_only=args.md_latest_release_only,
         include_timeline=args.md_timeline,
+        timeline_max_commits=args.md_timeline_max_commits,
         exclude_title_patterns=args.exclude_title,
         exclude_author_patterns=args.exclude_author,
-        exclude_message_patterns=args.exclude_message
+        exclude_message_patterns=args.exclude_message,
+        first_parent=args.first_parent,
+        nest_merged=args.nest_merged,
+        deepen_shallow=args.deepen_shallow,
+        deepen_max_depth=args.deepen_max_depth,
+        json_format=args.json_format,
+        charts_dir=args.charts,
+        engine=args.engine,
+        write_commit_graph=args.write_commit_graph,
+        tag_cache=(args.tag_cache or True) if args.tag_cache is not None else None,
+        fill_after_exclude=args.fill_after_exclude,
+        delta_path=(args.delta or str(Path(args.output).with_suffix('.delta.json'))) if args.delta is not None else None,
+        delta_previous_path=args.delta_previous,
+        net_release_stats=args.net_release_stats,
+        exclude_trailer_patterns=args.exclude_trailer,
+        fragments_dir=args.html_fragments
     )
 
 